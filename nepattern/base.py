@@ -2,15 +2,16 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache, partial
+from operator import attrgetter, methodcaller
 from pathlib import Path
-import re
 import sys
 from types import MethodType
 from typing import Any, Callable, Final, ForwardRef, Generic, Match, TypeVar, Union, final, overload, cast
 
-from tarina import DateParser, lang
+from tarina import DateParser, Empty, lang
 
-from .core import Pattern, _RegexPattern
+from .core import Pattern, ValidateResult, _RegexPattern
 from .exception import MatchFailed
 from .util import TPattern
 
@@ -52,6 +53,22 @@ def _SpecialPattern(cls: type[_TP]) -> type[_TP]:
     return cls
 
 
+def _dispatch_execute(
+    pat: Pattern[_T], handlers: dict[type, Callable[[Any], _T]], input_: Any, expected: str
+) -> ValidateResult[_T] | None:
+    """按输入的确切类型查找转换函数并直接执行; 未命中时返回 None, 交由 match 按 isinstance 逐一判断"""
+    if "match" in pat.__dict__ or (handler := handlers.get(input_.__class__)) is None:
+        return None
+    try:
+        return ValidateResult(handler(input_))
+    except (ValueError, TypeError, OverflowError):
+        return ValidateResult(
+            error=lambda: MatchFailed(
+                lang.require("nepattern", "error.content").format(target=input_, expected=expected)
+            )
+        )
+
+
 @_SpecialPattern
 class DirectPattern(Pattern[TOrigin]):
     """直接判断"""
@@ -61,12 +78,23 @@ class DirectPattern(Pattern[TOrigin]):
         super().__init__(type(target), alias)
 
     def match(self, input_: Any):
-        if input_ != self.target:
+        if input_ is not self.target and input_ != self.target:
             raise MatchFailed(
                 lang.require("nepattern", "error.content").format(target=input_, expected=self.target)
             )
         return input_
 
+    def execute(self, input_: Any) -> ValidateResult[TOrigin]:
+        if "match" in self.__dict__:  # match 被 combine 或 nepattern.func 替换时走通用流程
+            return super().execute(input_)
+        if input_ is self.target or input_ == self.target:
+            return ValidateResult(input_)
+        return ValidateResult(
+            error=lambda: MatchFailed(
+                lang.require("nepattern", "error.content").format(target=input_, expected=self.target)
+            )
+        )
+
     def __eq__(self, other):  # pragma: no cover
         return isinstance(other, DirectPattern) and self.target == other.target
 
@@ -83,7 +111,7 @@ class DirectTypePattern(Pattern[TOrigin]):
         super().__init__(origin, alias)
 
     def match(self, input_: Any):
-        if not isinstance(input_, self.origin):
+        if input_.__class__ is not self.origin and not isinstance(input_, self.origin):
             raise MatchFailed(
                 lang.require("nepattern", "error.type").format(
                     type=input_.__class__, target=input_, expected=self.origin
@@ -91,6 +119,19 @@ class DirectTypePattern(Pattern[TOrigin]):
             )
         return input_
 
+    def execute(self, input_: Any) -> ValidateResult[TOrigin]:
+        if "match" in self.__dict__:  # pragma: no cover
+            return super().execute(input_)
+        if input_.__class__ is self.origin or isinstance(input_, self.origin):
+            return ValidateResult(input_)
+        return ValidateResult(
+            error=lambda: MatchFailed(
+                lang.require("nepattern", "error.type").format(
+                    type=input_.__class__, target=input_, expected=self.origin
+                )
+            )
+        )
+
     def __eq__(self, other):  # pragma: no cover
         return isinstance(other, DirectTypePattern) and self.origin is other.origin
 
@@ -112,17 +153,28 @@ class RegexPattern(_RegexPattern[Match[str]]):
                     type=input_.__class__, target=input_, expected="str"
                 )
             )
-        if mat := (re.match(self.pattern, input_) or re.search(self.pattern, input_)):
+        if mat := self._find(input_):
             return mat
         raise MatchFailed(
             lang.require("nepattern", "error.content").format(target=input_, expected=self.pattern)
         )
 
+    def execute(self, input_: Any) -> ValidateResult[Match[str]]:
+        if "match" in self.__dict__ or not isinstance(input_, str):
+            return super().execute(input_)
+        if mat := self._find(input_):
+            return ValidateResult(mat)
+        return ValidateResult(
+            error=lambda: MatchFailed(
+                lang.require("nepattern", "error.content").format(target=input_, expected=self.pattern)
+            )
+        )
+
     def __eq__(self, other):  # pragma: no cover
         return isinstance(other, RegexPattern) and self.pattern == other.pattern
 
-    def copy(self):  # pragma: no cover
-        return RegexPattern(self.pattern, self.alias)
+
+_REVISION = attrgetter("_revision")
 
 
 @_SpecialPattern
@@ -133,7 +185,7 @@ class UnionPattern(Pattern[_T]):
     # for_validate: list[BasePattern]
     # for_equal: list[str | object]
 
-    __slots__ = ("base", "optional", "for_validate", "for_equal")
+    __slots__ = ("base", "optional", "for_validate", "for_equal", "_candidates", "_candidates_revision")
 
     def __init__(self, *base: Any):
         self.base = list(base)
@@ -152,6 +204,10 @@ class UnionPattern(Pattern[_T]):
                     self.for_validate.append(arg)
             else:
                 self.for_equal.append(arg)
+        self._candidates: dict[type, tuple[Pattern, ...]] = {}
+        """按输入类型缓存可能匹配成功的分支"""
+        self._candidates_revision = -1
+        """建立缓存时各分支 `_revision` 之和; 各分支的 `_revision` 只增不减, 其和改变即说明有分支被修改"""
         alias_content = "|".join([str(a) for a in self.for_validate] + [repr(a) for a in self.for_equal])  # pragma: no cover
         types = [i.origin for i in self.for_validate] + [type(i) for i in self.for_equal]  # pragma: no cover
         super().__init__(Union.__getitem__(tuple(types)), alias=alias_content)  # type: ignore
@@ -160,7 +216,13 @@ class UnionPattern(Pattern[_T]):
         if not input_:
             input_ = None
         if input_ not in self.for_equal:
-            for pat in self.for_validate:
+            revision = sum(map(_REVISION, self.for_validate))
+            if revision != self._candidates_revision or len(self._candidates) >= 64:
+                self._candidates.clear()
+                self._candidates_revision = revision
+            if (candidates := self._candidates.get(cls := input_.__class__)) is None:
+                candidates = self._candidates[cls] = self._select(cls)
+            for pat in candidates:
                 if (res := pat.execute(input_)).success:
                     return res.value()
             raise MatchFailed(
@@ -168,6 +230,32 @@ class UnionPattern(Pattern[_T]):
             )
         return input_
 
+    def _select(self, cls: type) -> tuple[Pattern, ...]:
+        """按原有顺序筛选出可能接受该类型输入的分支
+
+        仅以 accept 限定类型的 Pattern 与 DirectTypePattern 可以预先判断;
+        DirectTypePattern 命中时必然匹配成功, 其后的分支无需再尝试
+        """
+        candidates = []
+        for pat in self.for_validate:
+            if "match" in pat.__dict__:
+                candidates.append(pat)
+                continue
+            try:
+                if type(pat) is DirectTypePattern:
+                    if issubclass(cls, pat.origin):
+                        candidates.append(pat)
+                        break
+                    continue
+                if type(pat).match is Pattern.match and pat._accepts_types:
+                    if issubclass(cls, pat._accepts_types):
+                        candidates.append(pat)
+                    continue
+            except TypeError:  # pragma: no cover
+                pass
+            candidates.append(pat)
+        return tuple(candidates)
+
     @classmethod
     def of(cls, *types: type[_T1]) -> UnionPattern[_T1]:
         from .main import parser
@@ -235,20 +323,33 @@ class SwitchPattern(Pattern[_TCase], Generic[_TCase, _TSwtich]):
 
     def __init__(self, data: dict[_TSwtich, _TCase] | dict[_TSwtich | ellipsis, _TCase]):
         self.switch = data  # type: ignore
+        self._default = data.get(Ellipsis, Empty)  # type: ignore
         super().__init__(type(list(data.values())[0]))
 
     def __repr__(self):
         return "|".join(f"{k}" for k in self.switch if k != Ellipsis)
 
     def match(self, input_: Any) -> _TCase:
-        try:
-            return self.switch[input_]
-        except KeyError as e:
-            if Ellipsis in self.switch:
-                return self.switch[...]
+        if (res := self.switch.get(input_, self._default)) is Empty:
             raise MatchFailed(
                 lang.require("nepattern", "error.content").format(target=input_, expected=self.__repr__())
-            ) from e
+            )
+        return res  # type: ignore
+
+    def execute(self, input_: Any) -> ValidateResult[_TCase]:
+        if "match" in self.__dict__:  # pragma: no cover
+            return super().execute(input_)
+        try:
+            res = self.switch.get(input_, self._default)
+        except TypeError as e:  # 不可哈希的输入
+            return ValidateResult(error=e)
+        if res is Empty:
+            return ValidateResult(
+                error=lambda: MatchFailed(
+                    lang.require("nepattern", "error.content").format(target=input_, expected=self.__repr__())
+                )
+            )
+        return ValidateResult(res)  # type: ignore
 
     def __eq__(self, other):  # pragma: no cover
         return isinstance(other, SwitchPattern) and self.switch == other.switch
@@ -287,13 +388,29 @@ class AntiPattern(Pattern[TOrigin]):
         super().__init__(origin=pattern.origin, alias=f"!{pattern}")
 
     def match(self, input_: Any):
-        try:
-            self.base.match(input_)
-        except MatchFailed:
-            return input_
-        raise MatchFailed(
-            lang.require("nepattern", "error.content").format(target=input_, expected=self.alias)
-        )
+        # 基础表达式的失败只是控制流, 经由 execute 判断, 不再抛出并捕获其异常
+        res = self._anti(input_)
+        if res.success:
+            return res._value
+        raise res.error()  # type: ignore
+
+    def execute(self, input_: Any) -> ValidateResult[TOrigin]:
+        if "match" in self.__dict__:  # pragma: no cover
+            return super().execute(input_)
+        return self._anti(input_)
+
+    def _anti(self, input_: Any) -> ValidateResult[TOrigin]:
+        res = self.base.execute(input_)
+        if res.success:
+            return ValidateResult(
+                error=lambda: MatchFailed(
+                    lang.require("nepattern", "error.content").format(target=input_, expected=self.alias)
+                )
+            )
+        # 与 match 一致, 只有 MatchFailed (含延迟构造的错误) 视为基础表达式不匹配, 其他异常原样返回
+        if isinstance(err := res._error, Exception) and not isinstance(err, MatchFailed):
+            return ValidateResult(error=err)
+        return ValidateResult(input_)
 
     def __eq__(self, other):  # pragma: no cover
         return isinstance(other, AntiPattern) and self.base == other.base
@@ -331,13 +448,25 @@ class StrPattern(Pattern[str]):
         if isinstance(input_, str):
             return input_.value if isinstance(input_, Enum) else input_
         elif isinstance(input_, (bytes, bytearray)):
-            return input_.decode()
+            try:
+                return input_.decode()
+            except UnicodeDecodeError as e:
+                raise MatchFailed(
+                    lang.require("nepattern", "error.content").format(target=input_, expected="str")
+                ) from e
         raise MatchFailed(
             lang.require("nepattern", "error.type").format(
                 type=input_.__class__, target=input_, expected="str | bytes | bytearray"
             )
         )
 
+    _HANDLERS = {str: str.__str__, bytes: bytes.decode, bytearray: bytearray.decode}
+
+    def execute(self, input_: Any) -> ValidateResult[str]:
+        if (res := _dispatch_execute(self, self._HANDLERS, input_, "str")) is None:
+            return super().execute(input_)
+        return res
+
     def __eq__(self, other):  # pragma: no cover
         return other.__class__ is StrPattern
 
@@ -364,6 +493,13 @@ class BytesPattern(Pattern[bytes]):
             )
         )
 
+    _HANDLERS = {bytes: bytes, bytearray: bytes, str: str.encode}
+
+    def execute(self, input_: Any) -> ValidateResult[bytes]:
+        if (res := _dispatch_execute(self, self._HANDLERS, input_, "bytes")) is None:
+            return super().execute(input_)
+        return res
+
     def __eq__(self, other):  # pragma: no cover
         return other.__class__ is BytesPattern
 
@@ -380,15 +516,24 @@ class IntPattern(Pattern[int]):
     def match(self, input_: Any) -> int:
         if isinstance(input_, int) and input_ is not True and input_ is not False:
             return input_
-        if isinstance(input_, (str, bytes, bytearray)) and len(input_) > 4300:  # pragma: no cover
-            raise ValueError("int too large to convert")
         try:
+            if isinstance(input_, (str, bytes, bytearray)) and len(input_) > 4300:  # pragma: no cover
+                raise ValueError("int too large to convert")
             return int(input_)
         except (ValueError, TypeError, OverflowError) as e:
             raise MatchFailed(
                 lang.require("nepattern", "error.content").format(target=input_, expected="int")
             ) from e
 
+    _HANDLERS: dict[type, Callable[[Any], int]] = {int: int.__index__, float: int}
+    if hasattr(sys, "get_int_max_str_digits"):  # 解释器自带长度限制时, 字符串无需再预先检查长度
+        _HANDLERS.update({str: int, bytes: int})
+
+    def execute(self, input_: Any) -> ValidateResult[int]:
+        if (res := _dispatch_execute(self, self._HANDLERS, input_, "int")) is None:
+            return super().execute(input_)
+        return res
+
     def __eq__(self, other):  # pragma: no cover
         return other.__class__ is IntPattern
 
@@ -413,6 +558,20 @@ class FloatPattern(Pattern[float]):
                 lang.require("nepattern", "error.content").format(target=input_, expected="float")
             ) from e
 
+    def execute(self, input_: Any) -> ValidateResult[float]:
+        if "match" in self.__dict__:  # pragma: no cover
+            return super().execute(input_)
+        if isinstance(input_, float):
+            return ValidateResult(input_)
+        try:
+            return ValidateResult(float(input_))
+        except (TypeError, ValueError):
+            return ValidateResult(
+                error=lambda: MatchFailed(
+                    lang.require("nepattern", "error.content").format(target=input_, expected="float")
+                )
+            )
+
     def __eq__(self, other):  # pragma: no cover
         return other.__class__ is FloatPattern
 
@@ -446,25 +605,45 @@ NUMBER: Final = NumberPattern()
 """一般数表达式，既可以浮点数也可以整数 """
 
 
+_BOOL_RESULTS: Final = {True: ValidateResult(True), False: ValidateResult(False)}
+"""布尔表达式成功时复用的结果, 成功的 ValidateResult 不会再被修改"""
+
+
+def _bool_failed(input_: Any) -> MatchFailed:
+    return MatchFailed(lang.require("nepattern", "error.content").format(target=input_, expected="bool"))
+
+
 @final
 @_SpecialPattern
 class BoolPattern(Pattern[bool]):
     def __init__(self):
         super().__init__(origin=bool, alias="bool")
 
+    _BOOL_MAP = {"true": True, "false": False, "True": True, "False": False}
+
     def match(self, input_: Any) -> bool:
         if input_ is True or input_ is False:
             return input_
         if isinstance(input_, bytes):  # pragma: no cover
             input_ = input_.decode()
-        if isinstance(input_, str):  # pragma: no cover
-            input_ = input_.lower()
-        if input_ == "true":
-            return True
-        if input_ == "false":
-            return False
+        if isinstance(input_, str) and (
+            (res := self._BOOL_MAP.get(input_)) is not None
+            or (res := self._BOOL_MAP.get(input_.lower())) is not None
+        ):
+            return res
         raise MatchFailed(lang.require("nepattern", "error.content").format(target=input_, expected="bool"))
 
+    def execute(self, input_: Any) -> ValidateResult[bool]:
+        if "match" in self.__dict__:  # pragma: no cover
+            return super().execute(input_)
+        if input_ is True or input_ is False:
+            return _BOOL_RESULTS[input_]
+        if isinstance(input_, str):
+            if (res := self._BOOL_MAP.get(input_)) is None:
+                res = self._BOOL_MAP.get(input_.lower())
+            return ValidateResult(error=partial(_bool_failed, input_)) if res is None else _BOOL_RESULTS[res]
+        return super().execute(input_)
+
     def __eq__(self, other):  # pragma: no cover
         return other.__class__ is BoolPattern
 
@@ -481,28 +660,45 @@ class WideBoolPattern(Pattern[bool]):
 
     BOOL_FALSE = {0, "0", "off", "f", "false", "n", "no"}
     BOOL_TRUE = {1, "1", "on", "t", "true", "y", "yes"}
+    _BOOL_MAP = {**dict.fromkeys(BOOL_FALSE, False), **dict.fromkeys(BOOL_TRUE, True)}
 
     def match(self, input_: Any) -> bool:
-        if input_ is True or input_ is False:
-            return input_
-        if isinstance(input_, bytes):  # pragma: no cover
-            input_ = input_.decode()
-        if isinstance(input_, str):
-            input_ = input_.lower()
+        # True/False 与 1/0 哈希相同, 无需单独判断; 字符串先按原样查找, 未命中时再转小写
         try:
-            if input_ in self.BOOL_TRUE:
-                return True
-            if input_ in self.BOOL_FALSE:
-                return False
-            raise MatchFailed(
-                lang.require("nepattern", "error.content").format(target=input_, expected="bool")
-            )
+            res = self._BOOL_MAP.get(input_)
         except (ValueError, TypeError) as e:
             raise MatchFailed(
                 lang.require("nepattern", "error.type").format(
                     type=input_.__class__, target=input_, expected="bool"
                 )
             ) from e
+        if res is None:
+            if isinstance(input_, bytes):  # pragma: no cover
+                input_ = input_.decode()
+            if isinstance(input_, str):
+                res = self._BOOL_MAP.get(input_.lower())
+            if res is None:
+                raise MatchFailed(
+                    lang.require("nepattern", "error.content").format(target=input_, expected="bool")
+                )
+        return res
+
+    def execute(self, input_: Any) -> ValidateResult[bool]:
+        if "match" in self.__dict__:  # pragma: no cover
+            return super().execute(input_)
+        try:
+            res = self._BOOL_MAP.get(input_)
+        except (ValueError, TypeError):
+            return super().execute(input_)
+        if res is None and isinstance(input_, str):
+            res = self._BOOL_MAP.get(input_.lower())
+        if res is None:
+            return (
+                ValidateResult(error=partial(_bool_failed, input_))
+                if isinstance(input_, str)
+                else super().execute(input_)
+            )
+        return _BOOL_RESULTS[res]
 
     def __eq__(self, other):  # pragma: no cover
         return other.__class__ is BoolPattern
@@ -552,6 +748,26 @@ class HexPattern(Pattern[int]):
                 lang.require("nepattern", "error.content").format(target=input_, expected="hex")
             ) from e
 
+    def execute(self, input_: Any) -> ValidateResult[int]:
+        if "match" in self.__dict__:  # pragma: no cover
+            return super().execute(input_)
+        if input_.__class__ is str or isinstance(input_, str):
+            try:
+                return ValidateResult(int(input_, 16))
+            except ValueError:
+                return ValidateResult(
+                    error=lambda: MatchFailed(
+                        lang.require("nepattern", "error.content").format(target=input_, expected="hex")
+                    )
+                )
+        return ValidateResult(
+            error=lambda: MatchFailed(
+                lang.require("nepattern", "error.type").format(
+                    type=input_.__class__, target=input_, expected="str"
+                )
+            )
+        )
+
     def __eq__(self, other):  # pragma: no cover
         return other.__class__ is HexPattern
 
@@ -563,6 +779,31 @@ HEX_COLOR = Pattern.regex_convert(r"(#[0-9a-fA-F]{6})", str, lambda m: m[1][1:],
 """匹配16进制颜色代码的表达式"""
 
 
+@lru_cache(maxsize=256)
+def _parse_isoformat(text: str) -> datetime | None:
+    """按 ISO 格式解析时间字符串, 无法解析时返回 None; 结果只取决于输入, 可以缓存复用"""
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    if text.endswith("Z"):  # 3.11 之前的 fromisoformat 不支持 Z 后缀
+        try:
+            return datetime.fromisoformat(f"{text[:-1]}+00:00")
+        except ValueError:
+            pass
+    return None
+
+
+def _parse_datetime(text: str) -> datetime:
+    """解析时间字符串
+
+    DateParser 支持相对时间 (如 "1s") 与仅含时刻的输入, 其结果取决于当前时间, 不能缓存
+    """
+    if (res := _parse_isoformat(text)) is not None:
+        return res
+    return DateParser.parse(text)
+
+
 @final
 @_SpecialPattern
 class DateTimePattern(Pattern[datetime]):
@@ -578,7 +819,12 @@ class DateTimePattern(Pattern[datetime]):
                     type=input_.__class__, target=input_, expected="str | int | float"
                 )
             )
-        return DateParser.parse(input_)
+        try:
+            return _parse_datetime(input_)
+        except ValueError as e:
+            raise MatchFailed(
+                lang.require("nepattern", "error.content").format(target=input_, expected="datetime")
+            ) from e
 
     def __eq__(self, other):  # pragma: no cover
         return other.__class__ is DateTimePattern
@@ -605,6 +851,15 @@ class PathPattern(Pattern[Path]):
                 lang.require("nepattern", "error.content").format(target=input_, expected="PathLike")
             ) from e
 
+    _HANDLERS = {str: Path}
+
+    def execute(self, input_: Any) -> ValidateResult[Path]:
+        if isinstance(input_, Path) and "match" not in self.__dict__:
+            return ValidateResult(input_)
+        if (res := _dispatch_execute(self, self._HANDLERS, input_, "PathLike")) is None:
+            return super().execute(input_)
+        return res
+
     def __eq__(self, other):  # pragma: no cover
         return other.__class__ is PathPattern
 
@@ -626,32 +881,64 @@ def combine(
     validator: Callable[[_T], bool] | None = None,
 ) -> Pattern[_T]:
     _new = current.copy()
-    if previous:
-        _match = cast(MethodType, _new.match).__func__
+    if alias:
+        _new.alias = alias
+    if not previous and not validator:
+        return _new
+    _match = cast(MethodType, _new.match).__func__
+    _previous = previous.match if previous else None
+
+    # 前置表达式只有类型限定与转换时, 直接内联其转换函数, 不再经过 previous.match 中的逐步判断
+    _prev_conv = (
+        previous._convert
+        if previous
+        and type(previous).match is Pattern.match
+        and "match" not in previous.__dict__
+        and previous._accepts_types is not None
+        and previous._pre_validator is None
+        and previous._post_validator is None
+        else None
+    )
+
+    # 前置表达式与验证器合并到同一个 match 中, 避免逐层包装带来的额外调用帧
+    if _prev_conv is not None and not validator:
+        _prev_types = previous._accepts_types  # type: ignore
+        _prev_revision = previous._revision  # type: ignore
 
         def match(self, input_):
-            return _match(self, previous.match(input_))
+            # 前置表达式在 combine 之后又被修改时, 内联的状态已经过期, 改为完整地经过 previous.match
+            if previous._revision != _prev_revision:  # type: ignore
+                return _match(self, previous.match(input_))  # type: ignore
+            # 前置表达式仍是必经的一步, 其不接受的输入类型视为匹配失败
+            if not isinstance(input_, _prev_types):
+                raise previous._type_failed(input_)  # type: ignore
+            if (res := _prev_conv(input_)) is None:
+                raise previous._content_failed(input_)  # type: ignore
+            return _match(self, res)
+
+    elif _previous and not validator:
 
-        _new.match = match.__get__(_new)
-    if alias:
-        _new.alias = alias
-    if validator:
-        _match = cast(MethodType, _new.match).__func__
+        def match(self, input_):
+            return _match(self, _previous(input_))
+
+    else:
 
         def match(self, input_):
-            res = _match(self, input_)
-            if not validator(res):
+            res = _match(self, _previous(input_) if _previous else input_)
+            if not validator(res):  # type: ignore
                 raise MatchFailed(
                     lang.require("nepattern", "error.content").format(target=input_, expected=alias)
                 )
             return res
 
-        _new.match = match.__get__(_new)
+    _new.match = match.__get__(_new)
     return _new
 
 
 DelimiterInt = combine(
     INTEGER,
-    Pattern(str).accept(str).convert(lambda _, x: x.replace(",", "_")),
+    # 逗号替换为下划线而非直接删除, 让 int() 继续校验分组 (如 "1,,000" 仍会失败);
+    # 单字符替换时 str.replace 比 str.translate 更快
+    Pattern(str).accept(str)._unary_convert(methodcaller("replace", ",", "_")),
     "DelimInt",
 )
@@ -5,12 +5,29 @@ from typing import final
 
 from .base import NONE, UnionPattern
 
+_version = 0
+
+
+def _touch():
+    """表达式组发生变动时递增版本号, 供依赖表达式组的缓存判断是否失效"""
+    global _version
+    _version += 1
+
 
 @final
 class Patterns(UserDict):
     def __init__(self, name):
         self.name = name
-        super().__init__({"": NONE})
+        super().__init__()
+        self.data[""] = NONE
+
+    def __setitem__(self, key, item):
+        _touch()
+        self.data[key] = item
+
+    def __delitem__(self, key):
+        _touch()
+        del self.data[key]
 
     def set(self, target, alias=None, cover=True, no_alias=False):
         """
@@ -22,6 +39,7 @@ class Patterns(UserDict):
             cover: 是否覆盖已有的转换器
             no_alias: 是否不使用目标类型自带的别名
         """
+        _touch()
         for k in {alias, None if no_alias else target.alias, target.origin}:
             if not k:
                 continue
@@ -44,6 +62,7 @@ class Patterns(UserDict):
             self.set(patterns[k], alias=k, no_alias=no_alias)
 
     def remove(self, origin_type, alias=None):
+        _touch()
         if alias and (al_pat := self.data.get(alias)):
             if isinstance(al_pat, UnionPattern):
                 self.data[alias] = UnionPattern(*filter(lambda x: x.alias != alias, al_pat.base))  # type: ignore
@@ -81,6 +100,7 @@ def create_local_patterns(name, data=None, set_current=True) -> Patterns:
     new = Patterns(name)
     new.update(data or {})
     _ctx[name] = new
+    _touch()
     if set_current:
         _current = name
     return new
@@ -93,12 +113,14 @@ def switch_local_patterns(name):
     if name not in _ctx:
         raise KeyError(name)
     _current = name
+    _touch()
 
 
 def reset_local_patterns():
     global _current
 
     _current = "$global"
+    _touch()
 
 
 def local_patterns():
@@ -110,13 +132,31 @@ def global_patterns():
     return _ctx["$global"]
 
 
+def _get_pattern(key, default=None):
+    """按先 local 后 global 的顺序查找表达式, 不构造合并后的表达式组"""
+    if _current != "$global" and (pat := _ctx[_current].data.get(key)) is not None:
+        return pat
+    return _ctx["$global"].data.get(key, default)
+
+
+_merged: Patterns | None = None
+_merged_version = -1
+
+
 def all_patterns():
-    """获取 global 与 local 的合并表达式组"""
+    """获取 global 与 local 的合并表达式组
+
+    返回的是缓存的共享对象, 会复用至表达式组下一次变动为止; 不要对其进行修改, 需要修改时请先复制
+    """
+    global _merged, _merged_version
+    if _merged is not None and _merged_version == _version:
+        return _merged
     new = Patterns("$temp")
-    new.update(global_patterns().data)
+    new.data.update(global_patterns().data)
     local = local_patterns()
     if not local.name.startswith("$"):
-        new.update(local_patterns().data)
+        new.data.update(local.data)
+    _merged, _merged_version = new, _version
     return new
 
 
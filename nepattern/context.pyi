@@ -1,8 +1,10 @@
 from collections import UserDict
-from typing import Any, Iterable, final
+from typing import Any, Iterable, TypeVar, final, overload
 
 from .core import Pattern
 
+_T = TypeVar("_T")
+
 @final
 class Patterns(UserDict[Any, Pattern]):
     name: str
@@ -43,4 +45,11 @@ def reset_local_patterns() -> None: ...
 def local_patterns() -> Patterns: ...
 def global_patterns() -> Patterns: ...
 def all_patterns() -> Patterns:
-    """获取 global 与 local 的合并表达式组"""
+    """获取 global 与 local 的合并表达式组
+
+    返回的是缓存的共享对象, 会复用至表达式组下一次变动为止; 不要对其进行修改, 需要修改时请先复制
+    """
+@overload
+def _get_pattern(key: Any) -> Pattern[Any] | None: ...
+@overload
+def _get_pattern(key: Any, default: _T) -> Pattern[Any] | _T: ...
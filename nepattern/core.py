@@ -1,27 +1,100 @@
 from __future__ import annotations
 
 from copy import deepcopy
+from functools import lru_cache, partial
 import re
+from types import MethodType
 from typing import Any, Callable, Generic, TypeVar, Union, overload
-from typing_extensions import Self
+from typing_extensions import Self, get_args, get_origin
 
 from tarina import Empty, generic_isinstance
 from tarina.lang import lang
 
 from .exception import MatchFailed
-from .util import TPattern
+from .util import CUnionType, TPattern
+
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 T = TypeVar("T")
 _T = TypeVar("_T")
 
 
+@lru_cache(maxsize=512)
+def _compile(pattern: str, flags: int = 0) -> TPattern:
+    """编译正则表达式, 相同的 (pattern, flags) 只会编译一次"""
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=512)
+def _compile_dfa(pattern: str):
+    """若安装了 google-re2, 则使用 RE2 (线性时间的 DFA 引擎) 编译; 不可用或不支持该语法时回退到 re
+
+    仅在显式传入 dfa=True 时使用, RE2 的匹配语义与 re 有所不同
+    """
+    if re2 is not None:  # pragma: no cover
+        options = re2.Options()
+        options.log_errors = False
+        try:
+            return re2.compile(pattern, options)
+        except re2.error:
+            pass
+    return _compile(pattern)
+
+
+def _finder(regex) -> Callable[[str], Any]:
+    """取得正则的匹配方法; 以 ^ 开头且非多行模式时 match 与先 match 后 search 等价, 否则使用 search"""
+    if regex.pattern.startswith("^") and not getattr(regex, "flags", 0) & re.MULTILINE:
+        return regex.match
+    return regex.search
+
+
+def _resolve_types(tp: Any) -> tuple[type, ...] | None:
+    """将 Any、普通类或由普通类组成的 Union 预先分解为可直接用于 isinstance 的类型元组, 无法分解时返回 None"""
+    if tp is Any:
+        return (object,)
+    if type(tp) is type:
+        return (tp,)
+    if get_origin(tp) in (Union, CUnionType):
+        args = get_args(tp)
+        if all(type(arg) is type for arg in args):
+            return args
+    return None
+
+
+def _type_checker(tp: Any) -> Callable[[Any], bool]:
+    """为类型构建检查函数; 元素为普通类的 list/set/tuple/dict 泛型会在 C 层面逐元素检查"""
+    if types := _resolve_types(tp):
+        return lambda x: isinstance(x, types)
+    origin, args = get_origin(tp), get_args(tp)
+    if origin is tuple:
+        # 仅 Tuple[T, ...] 为同类元素的变长元组; Tuple[T] 等定长元组交给 generic_isinstance 检查长度
+        if len(args) != 2 or args[1] is not Ellipsis:
+            return lambda x: generic_isinstance(x, tp)
+        args = args[:1]
+    if origin in (list, set, frozenset, tuple) and len(args) == 1 and type(args[0]) is type:
+        check = args[0].__instancecheck__
+        return lambda x: isinstance(x, origin) and all(map(check, x))
+    if origin is dict and len(args) == 2 and type(args[0]) is type and type(args[1]) is type:
+        check_key, check_value = args[0].__instancecheck__, args[1].__instancecheck__
+        return lambda x: (
+            isinstance(x, dict) and all(map(check_key, x.keys())) and all(map(check_value, x.values()))
+        )
+    return lambda x: generic_isinstance(x, tp)
+
+
 class ValidateResult(Generic[T]):
-    """参数表达式验证结果"""
+    """参数表达式验证结果
+
+    error 可以是异常本身, 也可以是构造异常的无参函数; 后者会在首次调用 `error()` 时才构造异常
+    """
 
     def __init__(
         self,
         value: T | type[Empty] = Empty,
-        error: Exception | type[Empty] = Empty,
+        error: Exception | Callable[[], Exception] | type[Empty] = Empty,
     ):
         self._value = value
         self._error = error
@@ -37,6 +110,8 @@ class ValidateResult(Generic[T]):
     def error(self) -> Exception | None:
         """获取验证错误"""
         if self._error is not Empty:
+            if not isinstance(self._error, Exception):
+                self._error = self._error()  # type: ignore
             assert isinstance(self._error, Exception)
             return self._error
 
@@ -57,24 +132,82 @@ class ValidateResult(Generic[T]):
         return (
             f"ValidateResult(value={self._value!r})"
             if self._value is not Empty
-            else f"ValidateResult(error={self._error!r})"
+            else f"ValidateResult(error={self.error()!r})"
         )
 
 
+@lru_cache(maxsize=None)
+def _executor_factory(check: str, pre: bool, conv: str, post: bool):
+    """按 Pattern 的配置生成只包含所需步骤的 execute 工厂函数
+
+    Args:
+        check: 输入类型检查方式, "" 表示无需检查, "types" 为 isinstance, "func" 为检查函数
+        pre: 是否有预验证
+        conv: 转换方式, "" 表示无转换, "plain" 为只接收输入值的可调用对象, "method" 为接收 self 与输入值的函数
+        post: 是否有后验证
+    """
+    lines = [
+        "def execute(self, input_):",
+        "    if 'match' in self.__dict__:",
+        "        return _generic(self, input_)",
+        "    try:",
+    ]
+    if check == "types":
+        lines.append("        if not isinstance(input_, _types):")
+    elif check == "func":
+        lines.append("        if not _check(input_):")
+    if check:
+        lines.append("            return _VR(error=_partial(self._type_failed, input_))")
+    if pre:
+        lines.append("        if not _pre(input_):")
+        lines.append("            return _VR(error=_partial(self._content_failed, input_))")
+    if conv:
+        lines.append(f"        res = _conv({'self, ' if conv == 'method' else ''}input_)")
+        lines.append(f"        if res is None{' or not _post(res)' if post else ''}:")
+        lines.append("            return _VR(error=_partial(self._content_failed, input_))")
+        lines.append("        return _VR(res)")
+    else:
+        lines.append("        return _VR(input_)")
+    lines.append("    except Exception as e:")
+    lines.append("        return _VR(error=e)")
+    lines.append("return execute")
+    body = "\n".join(f"    {line}" for line in lines)
+    src = f"def _make(_types, _check, _pre, _conv, _post):\n{body}\n"
+    namespace = {"_VR": ValidateResult, "_partial": partial, "_generic": Pattern.execute}
+    exec(compile(src, f"<nepattern executor {check}|{pre}|{conv}|{post}>", "exec"), namespace)
+    return namespace["_make"]
+
+
 class Pattern(Generic[T]):
+    origin: type[T]
+    alias: str | None
+
+    _accepts: Any
+    _accepts_types: tuple[type, ...] | None
+    _accepts_check: Callable[[Any], bool] | None
+    _pre_validator: Callable[[Any], bool] | None
+    _post_validator: Callable[[T], bool] | None
+    _converter: Callable[[Self, Any], T | None] | Callable[[Any], T | None] | None
+    _convert: Callable[[Any], T | None] | None
+    _pre_validate_modified: bool
+    _revision: int
+    """每次经由构建方法修改后递增, 供缓存了本表达式状态的其他表达式判断是否失效"""
+
     @staticmethod
-    def regex_match(pattern: str | TPattern, alias: str | None = None) -> _RegexPattern[str]:
-        """构建一个仅正则表达式匹配的 Pattern，不进行转换"""
-        pat = _RegexPattern(pattern, str, alias or str(pattern))
+    def regex_match(
+        pattern: str | TPattern, alias: str | None = None, dfa: bool = False
+    ) -> _RegexPattern[str]:
+        """构建一个仅正则表达式匹配的 Pattern，不进行转换
+
+        `dfa=True` 且安装了 google-re2 时, 字符串表达式改用 RE2 引擎匹配 (RE2 不支持的语法仍回退到 re).
+        注意 RE2 与 re 的语义并不完全相同: `\\w`/`\\d` 等只匹配 ASCII 字符, `$` 也不会匹配末尾换行符之前的位置
+        """
+        pat = _RegexPattern(pattern, str, alias or str(pattern), dfa=dfa)
 
         @pat.convert
         def _(self: _RegexPattern, x: str):
-            mat = re.match(self.pattern, x) or re.search(self.pattern, x)
-            if not mat:
-                raise MatchFailed(
-                    lang.require("nepattern", "error.content").format(target=x, expected=self.pattern)
-                )
-            return mat[0]
+            mat = self._find(x)
+            return mat[0] if mat else None
 
         return pat
 
@@ -95,24 +228,16 @@ class Pattern(Generic[T]):
             def _(self: _RegexPattern, x):
                 if isinstance(x, origin):
                     return x
-                mat = re.match(self.pattern, x) or re.search(self.pattern, x)
-                if not mat:
-                    raise MatchFailed(
-                        lang.require("nepattern", "error.content").format(target=x, expected=self.pattern)
-                    )
-                return fn(mat)
+                mat = self._find(x)
+                return fn(mat) if mat else None
 
         else:
             pat.accept(str)
 
             @pat.convert
             def _(self: _RegexPattern, x: str):
-                mat = re.match(self.pattern, x) or re.search(self.pattern, x)
-                if not mat:
-                    raise MatchFailed(
-                        lang.require("nepattern", "error.content").format(target=x, expected=self.pattern)
-                    )
-                return fn(mat)
+                mat = self._find(x)
+                return fn(mat) if mat else None
 
         return pat
 
@@ -134,10 +259,44 @@ class Pattern(Generic[T]):
         self.alias = alias
 
         self._accepts = Any
+        self._accepts_types = (object,)
+        self._accepts_check = None
         self._post_validator = None
-        self._pre_validator = (lambda x: generic_isinstance(x, self.origin)) if origin else None
+        self._pre_validator = _type_checker(origin) if origin else None
         self._converter = None
+        self._convert = None
         self._pre_validate_modified = False
+        self._revision = 0
+        self._compile_executor()
+
+    def _compile_executor(self):
+        """为未重写 match 与 execute 的 Pattern 生成专用的 execute, 省去每次调用时对各个步骤的判断
+
+        所有构建方法都会调用此方法, 因此也在此递增 `_revision`
+        """
+        self._revision += 1
+        cls = self.__class__
+        if cls.match is not Pattern.match or cls.execute is not Pattern.execute:
+            return
+        if self._accepts_types == (object,):
+            check = ""
+        else:
+            check = "types" if self._accepts_types else "func"
+        if self._convert is None:
+            conv = ""
+        else:
+            conv = "plain" if self._convert is self._converter else "method"
+        make = _executor_factory(
+            check, self._pre_validator is not None, conv, self._post_validator is not None
+        )
+        execute = make(
+            self._accepts_types,
+            self._accepts_check,
+            self._pre_validator,
+            self._converter,
+            self._post_validator,
+        )
+        self.execute = MethodType(execute, self)
 
     def __init_subclass__(cls, **kwargs):
         cls.__hash__ = Pattern.__hash__
@@ -147,49 +306,72 @@ class Pattern(Generic[T]):
         if input_type is ...:
             input_type = Any
         self._accepts = input_type
+        self._accepts_types = _resolve_types(input_type)
+        self._accepts_check = None if self._accepts_types else _type_checker(input_type)
         if not self._pre_validate_modified:
             self._pre_validator = None
+        self._compile_executor()
         return self
 
     def pre_validate(self, func: Callable[[Any], bool]):
         """设置预验证函数 (经过 accept 后，convert 前)"""
         self._pre_validator = func
         self._pre_validate_modified = True
+        self._compile_executor()
         return self
 
     def post_validate(self, func: Callable[[T], bool]):
         """设置后验证函数 (convert 后，仅当设置了 converter 才会生效)"""
         self._post_validator = func
+        self._compile_executor()
         return self
 
     def convert(self, func: Callable[[Self, Any], T | None]):
         """设置转换函数, 返回 None 时表示转换失败"""
         self._converter = func
+        self._convert = MethodType(func, self)
+        self._compile_executor()
         return self
 
-    def match(self, input_: Any) -> T:
-        if not generic_isinstance(input_, self._accepts):
-            raise MatchFailed(
-                lang.require("nepattern", "error.type").format(target=input_, expected=self._accepts)
+    def _unary_convert(self, func: Callable[[Any], T | None]):
+        """设置只接收输入值的转换函数, 仅供库内的表达式使用; C 实现的可调用对象调用时不经过额外的 Python 帧"""
+        self._converter = func
+        self._convert = func
+        self._compile_executor()
+        return self
+
+    def _type_failed(self, input_: Any) -> MatchFailed:
+        return MatchFailed(
+            lang.require("nepattern", "error.type").format(
+                type=input_.__class__, target=input_, expected=self._accepts
             )
+        )
+
+    def _content_failed(self, input_: Any) -> MatchFailed:
+        return MatchFailed(
+            lang.require("nepattern", "error.content").format(target=input_, expected=self.origin)
+        )
+
+    def match(self, input_: Any) -> T:
+        if not (
+            isinstance(input_, self._accepts_types) if self._accepts_types else self._accepts_check(input_)
+        ):
+            raise self._type_failed(input_)
         if self._pre_validator and not self._pre_validator(input_):
-            raise MatchFailed(
-                lang.require("nepattern", "error.content").format(target=input_, expected=self.origin)
-            )
-        if self._converter:
-            input_ = self._converter(self, input_)
-            if input_ is None:
-                raise MatchFailed(
-                    lang.require("nepattern", "error.content").format(target=input_, expected=self.origin)
-                )
-            if self._post_validator and not self._post_validator(input_):
-                raise MatchFailed(
-                    lang.require("nepattern", "error.content").format(target=input_, expected=self.origin)
-                )
-        return input_
+            raise self._content_failed(input_)
+        if not self._convert:
+            return input_
+        res = self._convert(input_)
+        if res is None or (self._post_validator and not self._post_validator(res)):
+            raise self._content_failed(input_)
+        return res
 
     def execute(self, input_: Any) -> ValidateResult[T]:
-        """执行验证"""
+        """执行验证
+
+        未重写 match 的 Pattern 会在构建时换上由 `_executor_factory` 生成的 execute,
+        其类型与验证失败不经过异常, 错误会在访问 `error()` 时才构造
+        """
         try:
             return ValidateResult(self.match(input_))
         except Exception as e:
@@ -221,31 +403,49 @@ class Pattern(Generic[T]):
             self.alias = other
         return self
 
+    def _fingerprint(self) -> tuple[Any, ...]:
+        return self.origin, self.alias, self._accepts, self._converter
+
     def __hash__(self):
-        return hash((self.origin, self.alias, self._accepts, self._converter))
+        return hash(self._fingerprint())
 
     def __eq__(self, other):
-        return isinstance(other, Pattern) and self.__hash__() == other.__hash__()
+        # 直接比较指纹元组 (逐项先比较身份), 不再为双方各计算一次哈希
+        return other is self or (isinstance(other, Pattern) and self._fingerprint() == other._fingerprint())
 
 
 class _RegexPattern(Pattern[T]):
-    def __init__(self, pattern: str | TPattern, origin: type[T], alias: str | None = None):
+    def __init__(self, pattern: str | TPattern, origin: type[T], alias: str | None = None, dfa: bool = False):
         super().__init__(origin, alias)
         _pat = pattern if isinstance(pattern, str) else pattern.pattern
         if _pat.startswith("^") or _pat.endswith("$"):
             raise ValueError(lang.require("nepattern", "error.pattern_head_or_tail").format(target=pattern))
+        self.dfa = dfa
         if isinstance(pattern, str):
             self.pattern = f"^{pattern}$"
+            self.regex = self._compile_str(self.pattern)
         else:
-            self.pattern = re.compile(f"^{pattern.pattern}$", pattern.flags)
+            self.pattern = self.regex = _compile(f"^{pattern.pattern}$", pattern.flags)
+        self._find = _finder(self.regex)
+
+    def _compile_str(self, pattern: str):
+        return _compile_dfa(pattern) if self.dfa else _compile(pattern)
+
+    def _content_failed(self, input_: Any) -> MatchFailed:
+        # 转换函数未匹配时返回 None, 由 match/execute 在此构造错误, 不再于转换函数中抛出
+        return MatchFailed(
+            lang.require("nepattern", "error.content").format(target=input_, expected=self.pattern)
+        )
 
     def prefixed(self):
         """转为前缀型匹配"""
         new = self.copy()
         if isinstance(self.pattern, str):
             new.pattern = self.pattern[:-1]
+            new.regex = self._compile_str(new.pattern)
         else:  # pragma: no cover
-            new.pattern = re.compile(self.pattern.pattern[:-1], self.pattern.flags)
+            new.pattern = new.regex = _compile(self.pattern.pattern[:-1], self.pattern.flags)
+        new._find = _finder(new.regex)
         return new
 
     def suffixed(self):
@@ -253,6 +453,8 @@ class _RegexPattern(Pattern[T]):
         new = self.copy()
         if isinstance(self.pattern, str):
             new.pattern = self.pattern[1:]
+            new.regex = self._compile_str(new.pattern)
         else:  # pragma: no cover
-            new.pattern = re.compile(self.pattern.pattern[1:], self.pattern.flags)
+            new.pattern = new.regex = _compile(self.pattern.pattern[1:], self.pattern.flags)
+        new._find = _finder(new.regex)
         return new
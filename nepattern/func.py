@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from functools import reduce
+from operator import attrgetter, itemgetter
 from typing import Any, Callable, Protocol, TypeVar, overload
 
 from .core import Pattern
@@ -9,6 +10,17 @@ T = TypeVar("T")
 T1 = TypeVar("T1")
 
 
+def _iterable(pat: Pattern, new: Pattern) -> Callable[[Any], Any]:
+    """返回产生 pat 匹配结果的函数
+
+    若 pat 由 Map/Filter 构造且未被再次包装, 则返回其惰性版本, 使后续操作与之融合为一次迭代, 跳过中间列表
+    """
+    lazy = pat.__dict__.get("_lazy")
+    if lazy and pat.match.__func__ is lazy[0]:
+        return lazy[1]
+    return new.match
+
+
 def Index(
     pat: Pattern[list[T]],
     index: int,
@@ -59,12 +71,16 @@ def Map(
     funcname: str | None = None,
 ) -> Pattern[list[T1]]:
     _new = pat.copy()
-    _match = _new.match
+    _source = _iterable(pat, _new)
 
     def match(self, input_):
-        return list(map(func, _match(input_)))
+        return list(map(func, _source(input_)))
+
+    def lazy(input_):
+        return map(func, _source(input_))
 
     _new.match = match.__get__(_new)
+    _new._lazy = (match, lazy)
     _new.alias = f"{_new}.map({funcname or func.__name__})"
     
     return _new  # type: ignore
@@ -76,12 +92,16 @@ def Filter(
     funcname: str | None = None,
 ) -> Pattern[list[T]]:
     _new = pat.copy()
-    _match = _new.match
+    _source = _iterable(pat, _new)
 
     def match(self, input_):
-        return list(filter(func, _match(input_)))
+        return list(filter(func, _source(input_)))
+
+    def lazy(input_):
+        return filter(func, _source(input_))
 
     _new.match = match.__get__(_new)
+    _new._lazy = (match, lazy)
     _new.alias = f"{_new}.filter({funcname or func.__name__})"
     
     return _new
@@ -109,10 +129,10 @@ def Sum(
     pat: Pattern[list[_SupportsSumNoDefaultT]]
 ) -> Pattern[_SupportsSumNoDefaultT]:
     _new = pat.copy()
-    _match = _new.match
+    _source = _iterable(pat, _new)
 
     def match(self, input_):
-        return sum(_match(input_))
+        return sum(_source(input_))
 
     _new.match = match.__get__(_new)
     _new.alias = f"sum({_new})"
@@ -145,10 +165,10 @@ def Reduce(
     funcname: str | None = None,
 ) -> Pattern:
     _new = pat.copy()
-    _match = _new.match
+    _source = _iterable(pat, _new)
 
     def match(self, input_):
-        return reduce(func, _match(input_), initializer) if initializer is not None else reduce(func, _match(input_))  # type: ignore
+        return reduce(func, _source(input_), initializer) if initializer is not None else reduce(func, _source(input_))  # type: ignore
 
     _new.match = match.__get__(_new)
     _new.alias = f"{_new}.reduce({funcname or func.__name__})"
@@ -161,10 +181,10 @@ def Join(
     sep: str,
 ) -> Pattern[str]:
     _new = pat.copy()
-    _match = _new.match
+    _source = _iterable(pat, _new)
 
     def match(self, input_):
-        return sep.join(_match(input_))
+        return sep.join(_source(input_))
 
     _new.match = match.__get__(_new)
     _new.alias = f"{_new}.join({sep!r})"
@@ -211,8 +231,21 @@ def Dot(
     _new = pat.copy()
     _match = _new.match
 
-    def match(self, input_):
-        return getattr(_match(input_), key, default)
+    # attrgetter 会把 "a.b" 当作链式取属性, 含 "." 的键仍按 getattr(x, "a.b") 取同名属性
+    if "." in key:
+
+        def match(self, input_):
+            return getattr(_match(input_), key, default)
+
+    else:
+        _get = attrgetter(key)
+
+        def match(self, input_):
+            res = _match(input_)
+            try:
+                return _get(res)
+            except AttributeError:
+                return default
 
     _new.match = match.__get__(_new)
     _new.alias = f"{_new}.{key}"
@@ -229,10 +262,11 @@ def GetItem(
 ) -> Pattern[T]:
     _new = pat.copy()
     _match = _new.match
+    _get = itemgetter(key)
 
     def match(self, input_) -> T:
         try:
-            return _match(input_)[key]
+            return _get(_match(input_))
         except Exception as e:  # pragma: no cover
             if default is not None:
                 return default
@@ -8,10 +8,11 @@ from collections.abc import Sequence as ABCSeq
 from collections.abc import Set as ABCSet
 from contextlib import suppress
 from copy import deepcopy
+from functools import partial
 import inspect
 from types import FunctionType, LambdaType, MethodType
 import typing
-from typing import Any, ForwardRef, Literal, TypeVar, Union, overload, runtime_checkable, Protocol
+from typing import Any, Callable, ForwardRef, Literal, TypeVar, Union, overload, runtime_checkable, Protocol
 from typing_extensions import Annotated, get_args, get_origin
 
 from tarina.lang import lang
@@ -27,13 +28,17 @@ from .base import (
     UnionPattern,
     combine,
 )
-from .context import all_patterns
+from .context import _get_pattern
 from .core import Pattern
 from .util import CGenericAlias, CUnionType, GenericAlias, RawStr, TPattern
 
 _Contents = (Union, CUnionType, Literal)
 
 
+def _all_valid(validators: tuple[Callable[[Any], bool], ...], x: Any) -> bool:
+    return all(i(x) for i in validators)
+
+
 def _generic_parser(item: GenericAlias, extra: str) -> Pattern:  # type: ignore
     origin = get_origin(item)
     if origin is Annotated:
@@ -42,11 +47,15 @@ def _generic_parser(item: GenericAlias, extra: str) -> Pattern:  # type: ignore
             return SwitchPattern(switch)
         if not isinstance(_o := parser(org, extra), Pattern):  # type: ignore  # pragma: no cover
             raise TypeError(_o)
-        validators = [i for i in meta if callable(i)]  # pragma: no cover
+        validators = tuple(i for i in meta if callable(i))  # pragma: no cover
         return combine(
             _o,
             alias=al[-1] if (al := [i for i in meta if isinstance(i, str)]) else _o.alias,
-            validator=(lambda x: all(i(x) for i in validators)) if validators else None,
+            validator=(
+                (validators[0] if len(validators) == 1 else partial(_all_valid, validators))
+                if validators
+                else None
+            ),
         )
     if origin in _Contents:
         _args = {parser(t, extra) for t in get_args(item)}  # pragma: no cover
@@ -56,16 +65,87 @@ def _generic_parser(item: GenericAlias, extra: str) -> Pattern:  # type: ignore
     return Pattern(origin=item, alias=f"{repr(item).split('.')[-1]}").accept(item)
 
 
-def _typevar_parser(item: TypeVar):
+def _typevar_parser(item: TypeVar, extra: str):
     return Pattern(alias=f"{item}"[1:]).accept(item)
 
 
-def _protocol_parser(item: type):
+def _protocol_parser(item: type, extra: str):
     if not getattr(item, "_is_runtime_protocol", True):  # pragma: no cover
         item = runtime_checkable(deepcopy(item))  # type: ignore
     return Pattern(alias=f"{item}").accept(item)
 
 
+def _function_parser(item: FunctionType | MethodType | LambdaType, extra: str):
+    if len((sig := inspect.signature(item)).parameters) not in (1, 2):  # pragma: no cover
+        raise TypeError(f"{item} can only accept 1 or 2 argument")
+    anno = list(sig.parameters.values())[-1].annotation
+    pat = Pattern(
+        (Any if sig.return_annotation == inspect.Signature.empty else sig.return_annotation)  # type: ignore
+    ).accept(Any if anno == inspect.Signature.empty else anno)
+    return pat.convert(item) if len(sig.parameters) == 2 else pat._unary_convert(item)
+
+
+def _regex_parser(item: TPattern, extra: str):
+    return RegexPattern(item.pattern, alias=f"'{item.pattern}'")
+
+
+def _re_str_parser(pat: str):
+    return Pattern.regex_match(pat, alias=f"'{pat}'")
+
+
+def _rep_str_parser(pat: str):
+    return RegexPattern(pat, alias=f"'{pat}'")
+
+
+_STR_PREFIXES: dict[str, Callable[[str], Pattern]] = {"re": _re_str_parser, "rep": _rep_str_parser}
+"""字符串前缀 (冒号之前的部分) 到解析函数的映射"""
+
+
+def _str_parser(item: str, extra: str):
+    # 按第一个冒号切分后查表, 代替对各个前缀逐一 startswith
+    head, sep, pat = item.partition(":")
+    if sep and (handler := _STR_PREFIXES.get(head)):
+        return handler(pat)
+    if "|" in item:
+        names = item.split("|")
+        return UnionPattern(*(_get_pattern(i, i) for i in names if i))
+    return DirectPattern(item, alias=f"'{item}'")
+
+
+def _rawstr_parser(item: RawStr, extra: str):
+    return DirectPattern(item.value, alias=f"'{item.value}'")
+
+
+def _seq_parser(item: ABCSeq | ABCSet, extra: str):  # Args[foo, [123, int]]
+    return UnionPattern(*(parser(x) if inspect.isclass(x) else x for x in item))
+
+
+def _map_parser(item: ABCMap, extra: str):
+    return SwitchPattern(dict(item))
+
+
+def _forward_ref_parser(item: ForwardRef, extra: str):
+    return ForwardRefPattern(item)
+
+
+_PARSERS: dict[type, Callable[[Any, str], Pattern]] = {
+    GenericAlias: _generic_parser,
+    CGenericAlias: _generic_parser,
+    CUnionType: _generic_parser,
+    TypeVar: _typevar_parser,
+    FunctionType: _function_parser,
+    MethodType: _function_parser,
+    TPattern: _regex_parser,
+    str: _str_parser,
+    RawStr: _rawstr_parser,
+    list: _seq_parser,
+    tuple: _seq_parser,
+    set: _seq_parser,
+    dict: _map_parser,
+    ForwardRef: _forward_ref_parser,
+}
+"""按输入的确切类型分派的解析函数表, 未命中时再按 isinstance 顺序判断"""
+
 _T = TypeVar("_T")
 _K = TypeVar("_K")
 
@@ -111,44 +191,30 @@ def parser(item: Any, extra: str = "allow") -> Pattern:
     if isinstance(item, Pattern):
         return item
     with suppress(TypeError):
-        if item and (pat := all_patterns().get(item, None)):
+        if item and (pat := _get_pattern(item)):
             return pat
+    if handler := _PARSERS.get(type(item)):
+        return handler(item, extra)
     if isinstance(item, (GenericAlias, CGenericAlias, CUnionType)):
         return _generic_parser(item, extra)
-    if isinstance(item, TypeVar):
-        return _typevar_parser(item)
+    if isinstance(item, TypeVar):  # pragma: no cover
+        return _typevar_parser(item, extra)
     if getattr(item, "_is_protocol", False):
-        return _protocol_parser(item)
-    if isinstance(item, (FunctionType, MethodType, LambdaType)):
-        if len((sig := inspect.signature(item)).parameters) not in (1, 2):  # pragma: no cover
-            raise TypeError(f"{item} can only accept 1 or 2 argument")
-        anno = list(sig.parameters.values())[-1].annotation
-        return (
-            Pattern((Any if sig.return_annotation == inspect.Signature.empty else sig.return_annotation))  # type: ignore
-            .accept(Any if anno == inspect.Signature.empty else anno)
-            .convert(item if len(sig.parameters) == 2 else lambda _, x: item(x))
-        )
-    if isinstance(item, TPattern):  # type: ignore
-        return RegexPattern(item.pattern, alias=f"'{item.pattern}'")
+        return _protocol_parser(item, extra)
+    if isinstance(item, (FunctionType, MethodType, LambdaType)):  # pragma: no cover
+        return _function_parser(item, extra)
+    if isinstance(item, TPattern):  # type: ignore  # pragma: no cover
+        return _regex_parser(item, extra)
     if isinstance(item, str):
-        if item.startswith("re:"):
-            pat = item[3:]
-            return Pattern.regex_match(pat, alias=f"'{pat}'")
-        if item.startswith("rep:"):
-            pat = item[4:]
-            return RegexPattern(pat, alias=f"'{pat}'")
-        if "|" in item:
-            names = item.split("|")
-            return UnionPattern(*(all_patterns().get(i, i) for i in names if i))
-        return DirectPattern(item, alias=f"'{item}'")
-    if isinstance(item, RawStr):
-        return DirectPattern(item.value, alias=f"'{item.value}'")
-    if isinstance(item, (list, tuple, set, ABCSeq, ABCMuSeq, ABCSet, ABCMuSet)):  # Args[foo, [123, int]]
-        return UnionPattern(*map(lambda x: parser(x) if inspect.isclass(x) else x, item))
+        return _str_parser(item, extra)
+    if isinstance(item, RawStr):  # pragma: no cover
+        return _rawstr_parser(item, extra)
+    if isinstance(item, (list, tuple, set, ABCSeq, ABCMuSeq, ABCSet, ABCMuSet)):
+        return _seq_parser(item, extra)
     if isinstance(item, (dict, ABCMap, ABCMuMap)):
-        return SwitchPattern(dict(item))
-    if isinstance(item, ForwardRef):
-        return ForwardRefPattern(item)
+        return _map_parser(item, extra)
+    if isinstance(item, ForwardRef):  # pragma: no cover
+        return _forward_ref_parser(item, extra)
     if item is None or type(None) == item:
         return NONE
     if extra == "ignore":
@@ -1,84 +1,398 @@
-from typing import Union
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+import re
+from re import Match
+import time
+from typing import Dict, ForwardRef, List, Literal, Optional, Protocol, Sequence, Tuple, Type, TypeVar, Union
+from typing_extensions import Annotated
 
 import pytest
 
 from nepattern import *
+from nepattern.func import Dot, Filter, GetItem, Index, Join, Lower, Map, Reduce, Slice, Step, Sum, Upper
 
+_EMPTY_RE = re.compile("")
+_DIGITS_RE = re.compile(r"(\d+)")
+
+pat18 = RegexPattern(r"((https?://)?github\.com/)?(?P<owner>[^/]+)/(?P<repo>[^/]+)", "ghrepo")
+_MATCH18 = pat18.execute("https://github.com/ArcletProject/NEPattern").value()
+pat18_1 = parser(r"re:(\d+)")  # str starts with "re:" will convert to Pattern instead of RegexPattern
+pat18_2 = parser(r"rep:(\d+)")  # str starts with "rep:" will convert to RegexPattern
+pat18_3 = parser(_DIGITS_RE)  # re.Pattern will convert to RegexPattern
+
+
+def _at_convert(m: Match[str]):
+    value = int(m[1])
+    return value if value < 1000000 else None
+
+
+def _at_int(m: Match[str]):
+    return int(m[1])
+
+
+# 正则表达式在导入时编译一次, 各测试直接复用
+_P_REGEX = Pattern.regex_match("abc[A-Z]+123")
+_P_REGEX_COMPILED = Pattern.regex_match(re.compile(r"abc[A-Z]+123"))
+_P_REGEX_PREFIXED = Pattern.regex_match("abc").prefixed()
+_P_REGEX_SUFFIXED = Pattern.regex_match("abc").suffixed()
+_P_AT = Pattern.regex_convert(r"\[at:(\d+)\]", int, _at_convert, allow_origin=True)
+_P_AT_STRICT = Pattern.regex_convert(r"\[at:(\d+)\]", int, _at_int, allow_origin=False)
+
+# 以下表达式在多个测试间共享, 测试中不得对其调用 accept/convert/@ 等会原地修改的方法 (需要时先 copy)
+_PAT_INT = Pattern(int)
+_PAT_FLOAT = Pattern(float)
+_P_ON_123 = Pattern.on(123)
+_ANTI_P_INT = AntiPattern(_PAT_INT)
+
+_P_UNION_INT_BOOL = parser(Union[int, bool])
+_P_OPTIONAL_STR = parser(Optional[str])
+_P_LIST_BOOL_OR_INT = UnionPattern.of(List[bool], int)
+_P_SEQ_INT = parser(Sequence[int])
+
+_SW = SwitchPattern({"foo": 1, "bar": 2})
+_SW_DEF = SwitchPattern({"foo": 1, "bar": 2, ...: 3})
+_SW_ANNOTATED = parser(Annotated[int, {"foo": 1, "bar": 2}])
+
+
+@dataclass
+class Item:
+    a: int
+    b: str
+
+
+_ITEM = Item(123, "abc")
+
+
+def _to_str(_, x):
+    return str(x)
+
+
+def _to_int(_, x):
+    return int(x)
+
+
+def _inc(_, x):
+    return x + 1
+
+
+def _recip(_, x):
+    return 1 / x
+
+
+def _decode(_, x):
+    return x.decode()
+
+
+def _prefix_123(_, x):
+    return f"123{x}"
+
+
+def _repl_comma(_, x):
+    return x.replace(",", "_")
+
+
+def _strip_or_none(_, x):
+    return x.strip() or None
+
+
+def _nonzero(x):
+    return x != 0
+
+
+def _pos(x):
+    return x > 0
+
+
+def _non_negative(x):
+    return x >= 0
+
+
+def _lt10(x):
+    return x < 10
+
+
+def _in_0_10(x):
+    return 0 <= x <= 10
+
+
+def _gt1000(x):
+    return x > 1000
+
+
+def _even(x):
+    return x % 2 == 0
+
+
+def _upper(x):
+    return x.upper()
+
+
+def _vowel(x):
+    return x in "aeiou"
+
+
+def _upper_vowel(x):
+    return x in "AEIOU"
+
+
+def _gt99(x):
+    return x > 99
+
+
+def _add(x, y):
+    return x + y
+
+
+def _count_a(x):
+    return x.count("a")
+
+
+def _len_lt3(x):
+    return len(x) < 3
+
+
+def _to_list(_, x):
+    return list(x)
+
+
+def _startswith_123(_, content):
+    if isinstance(content, str) and content.startswith("123"):
+        return 123
 
-def test_type():
-    import re
 
-    assert isinstance(re.compile(""), TPattern)  # type: ignore
+def _after(prev: Pattern, func, self, x):
+    """先经过 prev 匹配, 再交给 func 转换"""
+    return func(self, prev.match(x))
 
 
-def test_basic():
-    from datetime import datetime
+_P_UNION_STRS = UnionPattern("abc", "efg")
+_P_UNION_INT_WIDE_BOOL = UnionPattern.with_(INTEGER, WIDE_BOOLEAN)
+_P_UNION_STR_BYTES = UnionPattern(DirectTypePattern(str), DirectTypePattern(bytes))
+_P_UNION_INT_STR = UnionPattern(INTEGER, DirectTypePattern(str))
+_P_UNION_CONVERTERS = UnionPattern(
+    Pattern(int).accept(int).convert(_inc), Pattern(str).accept(bytes).convert(_decode)
+)
+_P_DIRECT_ABC = DirectPattern("abc")
+_P_DIRECT_TYPE_INT = DirectTypePattern(int)
 
+
+_GLOBAL_REGISTRY = pytest.mark.xdist_group(name="global_registry")
+"""读写全局/local 表达式组的测试, 使用 pytest-xdist (--dist loadgroup) 时在同一进程中依次执行"""
+
+
+@pytest.fixture(scope="session")
+def pattern_map():
+    """global 与 local 合并后的表达式组, 整个测试会话只计算一次"""
+    return all_patterns()
+
+
+@pytest.fixture
+def local_scope():
+    """会修改 local 表达式组的测试使用, 结束时恢复为 global"""
+    yield
+    reset_local_patterns()
+
+
+_SUCCESS = object()
+_FAILED = object()
+"""用例表中表示仅断言成功/失败的期望值"""
+
+
+def ok(pat: Pattern, input_):
+    """断言匹配成功并返回结果"""
+    res = pat.execute(input_)
+    assert res.success
+    return res.value()
+
+
+def fail(pat: Pattern, input_):
+    """断言匹配失败"""
+    assert pat.execute(input_).failed
+
+
+def test_type():
+    assert isinstance(_EMPTY_RE, TPattern)  # type: ignore
+
+
+def test_string():
     res = STRING.execute("123")
     assert res.success
     assert res.value() == "123"
-    assert STRING.execute(b"123").value() == "123"
-    assert STRING.execute(123).failed
-
-    assert BYTES.execute(b"123").success
-    assert BYTES.execute("123").value() == b"123"
-    assert BYTES.execute(123).failed
-
-    assert INTEGER.execute(123).success
-    assert INTEGER.execute("123").value() == 123
-    assert INTEGER.execute(123.456).value() == 123
-    assert INTEGER.execute("123.456").failed
-    assert INTEGER.execute("-123").success
-
-    assert FLOAT.execute(123).value() == 123.0
-    assert FLOAT.execute("123").value() == 123.0
-    assert FLOAT.execute(123.456).value() == 123.456
-    assert FLOAT.execute("123.456").value() == 123.456
-    assert FLOAT.execute("1e10").value() == 1e10
-    assert FLOAT.execute("-123").value() == -123.0
-    assert FLOAT.execute("-123.456").value() == -123.456
-    assert FLOAT.execute("-123.456e-2").value() == -1.23456
-    assert FLOAT.execute("aaa").failed
-    assert FLOAT.execute([]).failed
-
-    assert BOOLEAN.execute(True).value() is True
-    assert BOOLEAN.execute(False).value() is False
-    assert BOOLEAN.execute("True").value() is True
-    assert BOOLEAN.execute("False").value() is False
-    assert BOOLEAN.execute("true").value() is True
-    assert BOOLEAN.execute("false").value() is False
-    assert BOOLEAN.execute("1").failed
-
-    assert WIDE_BOOLEAN.execute(True).value() is True
-    assert WIDE_BOOLEAN.execute(False).value() is False
-    assert WIDE_BOOLEAN.execute("True").value() is True
-    assert WIDE_BOOLEAN.execute("False").value() is False
-    assert WIDE_BOOLEAN.execute("true").value() is True
-    assert WIDE_BOOLEAN.execute("false").value() is False
-    assert WIDE_BOOLEAN.execute(1).value() is True
-    assert WIDE_BOOLEAN.execute(0).value() is False
-    assert WIDE_BOOLEAN.execute("yes").value() is True
-    assert WIDE_BOOLEAN.execute("no").value() is False
-    assert WIDE_BOOLEAN.execute("2").failed
-    assert WIDE_BOOLEAN.execute([]).failed
-
-    assert HEX.execute(123).failed
-    assert HEX.execute("0x123").value() == 0x123
-    assert HEX.execute("0o123").failed
-
-    assert DATETIME.execute("2020-01-01").value() == datetime(2020, 1, 1)
-    assert DATETIME.execute("2020-01-01-12:00:00").value() == datetime(2020, 1, 1, 12, 0, 0)
-    assert DATETIME.execute("2020-01-01-12:00:00.123").value() == datetime(2020, 1, 1, 12, 0, 0, 123000)
-    assert DATETIME.execute(datetime(2021, 12, 14).timestamp()).value() == datetime(2021, 12, 14, 0, 0, 0)
-    assert DATETIME.execute([]).failed
-
+    assert ok(STRING, b"123") == "123"
+    fail(STRING, 123)
+    assert ok(STRING, bytearray(b"123")) == "123"
+    fail(STRING, b"\xff")
+    assert isinstance(STRING.execute(b"\xff").error(), MatchFailed)
+    with pytest.raises(MatchFailed):
+        STRING.match(b"\xff")
+
+
+def test_bytes():
+    _bytes = b"123"
+    assert ok(BYTES, _bytes) is _bytes
+    assert ok(BYTES, "123") == b"123"
+    fail(BYTES, 123)
+
+
+@pytest.mark.parametrize(
+    "input_, expected", [(123, 123), ("123", 123), (123.456, 123), ("-123", -123), (True, 1)]
+)
+def test_integer(input_, expected):
+    assert ok(INTEGER, input_) == expected
+
+
+def test_integer_failed():
+    fail(INTEGER, "123.456")
+    fail(INTEGER, float("inf"))
+
+
+@pytest.mark.parametrize(
+    "input_, expected",
+    [
+        (123, 123.0),
+        ("123", 123.0),
+        (123.456, 123.456),
+        ("123.456", 123.456),
+        ("1e10", 1e10),
+        ("-123", -123.0),
+        ("-123.456", -123.456),
+        ("-123.456e-2", -1.23456),
+    ],
+)
+def test_float(input_, expected):
+    assert ok(FLOAT, input_) == expected
+
+
+def test_float_failed():
+    fail(FLOAT, "aaa")
+    fail(FLOAT, [])
+    assert isinstance(FLOAT.execute("aaa").error(), MatchFailed)
+
+
+_BOOL_CASES = [
+    (True, True),
+    (False, False),
+    ("True", True),
+    ("False", False),
+    ("true", True),
+    ("false", False),
+    ("1", _FAILED),
+    (1, _FAILED),
+]
+_WIDE_BOOL_CASES = [
+    (True, True),
+    (False, False),
+    ("True", True),
+    ("False", False),
+    ("true", True),
+    ("false", False),
+    (1, True),
+    (0, False),
+    ("yes", True),
+    ("no", False),
+    ("2", _FAILED),
+    ([], _FAILED),
+]
+
+
+def test_boolean():
+    for input_, expected in _BOOL_CASES:
+        res = BOOLEAN.execute(input_)
+        assert res.failed if expected is _FAILED else res.value() is expected, input_
+    assert isinstance(BOOLEAN.execute("yes").error(), MatchFailed)
+    assert BOOLEAN.execute("true") is BOOLEAN.execute(True)
+
+
+def test_wide_boolean():
+    for input_, expected in _WIDE_BOOL_CASES:
+        res = WIDE_BOOLEAN.execute(input_)
+        assert res.failed if expected is _FAILED else res.value() is expected, input_
+
+
+def test_hex():
+    fail(HEX, 123)
+    assert ok(HEX, "0x123") == 0x123
+    fail(HEX, "0o123")
+    assert ok(HEX, "ff") == 0xFF
+    assert isinstance(HEX.execute("0o123").error(), MatchFailed)
+
+
+def test_datetime():
+    assert ok(DATETIME, "2020-01-01") == datetime(2020, 1, 1)
+    assert ok(DATETIME, "2020-01-01-12:00:00") == datetime(2020, 1, 1, 12, 0, 0)
+    assert ok(DATETIME, "2020-01-01-12:00:00.123") == datetime(2020, 1, 1, 12, 0, 0, 123000)
+    assert ok(DATETIME, datetime(2021, 12, 14).timestamp()) == datetime(2021, 12, 14, 0, 0, 0)
+    fail(DATETIME, [])
+    assert isinstance(DATETIME.execute("not a date").error(), MatchFailed)
+    assert ok(DATETIME, "2020-01-01T12:00:00Z").utcoffset().total_seconds() == 0
+    # 相对时间依赖当前时间, 每次解析的结果都应重新计算
+    first = ok(DATETIME, "1s")
+    time.sleep(0.01)
+    assert ok(DATETIME, "1s") > first
+
+
+def test_path():
     assert PATH.execute("a/b/c").value().parts == ("a", "b", "c")
-    assert PATH.execute(Path("a/b/c")).value() == Path("a/b/c")
-    assert PATH.execute([]).failed
-
-    assert DelimiterInt.execute("1,000").value() == 1000
-    assert DelimiterInt.execute("1,000,000").value() == 1000000
-    assert DelimiterInt.execute("1,000,000.0").failed
+    _path = Path("a/b/c")
+    assert ok(PATH, _path) is _path
+    fail(PATH, [])
+
+
+def test_delimiter_int():
+    assert ok(DelimiterInt, "1,000") == 1000
+    assert ok(DelimiterInt, "1,000,000") == 1000000
+    fail(DelimiterInt, "1,000,000.0")
+    fail(DelimiterInt, "1,,000")
+    fail(DelimiterInt, 1000)
+
+
+_BUILTIN_PATTERNS = [*{id(p): p for p in global_patterns().values()}.values(), DelimiterInt, _ANTI_P_INT]
+_AGREE_INPUTS = [
+    123,
+    -1,
+    0,
+    1.5,
+    float("inf"),
+    True,
+    "123",
+    "1,000",
+    "1.5",
+    "abc",
+    "0xff",
+    "true",
+    "yes",
+    "",
+    b"123",
+    b"\xff",
+    bytearray(b"1"),
+    [],
+    {},
+    None,
+    Path("a"),
+    "2020-01-01",
+    "a@b.com",
+    "127.0.0.1",
+    "https://example.com",
+    "#ffffff",
+    "1" * 5000,
+]
+
+
+@pytest.mark.parametrize("pat", _BUILTIN_PATTERNS, ids=str)
+def test_match_execute_agree(pat: Pattern):
+    """内置表达式的 match 与 execute 对同一输入的结果应当一致"""
+    for input_ in _AGREE_INPUTS:
+        res = pat.execute(input_)
+        try:
+            value = pat.match(input_)
+        except Exception as e:
+            assert res.failed, input_
+            assert type(res.error()) is type(e), input_
+        else:
+            assert res.success, input_
+            assert res.value() == value, input_
 
 
 def test_result():
@@ -86,11 +400,11 @@ def test_result():
     assert res.success
     assert not res.failed
     assert not res.error()
-    assert NUMBER.execute(123).value() == 123
-    assert NUMBER.execute("123").value() == 123
-    assert NUMBER.execute(123.456).value() == 123.456
-    assert NUMBER.execute("123.456").value() == 123.456
-    assert NUMBER.execute("aaa").failed
+    assert ok(NUMBER, 123) == 123
+    assert ok(NUMBER, "123") == 123
+    assert ok(NUMBER, 123.456) == 123.456
+    assert ok(NUMBER, "123.456") == 123.456
+    fail(NUMBER, "aaa")
     res2 = NUMBER.execute([])
     assert res2.error()
     assert not res2.success
@@ -100,150 +414,176 @@ def test_result():
 
 def test_pattern_of():
     """测试 Pattern 的快速创建方法之一, 对类有效"""
-    pat = Pattern(int)
+    pat = _PAT_INT
     assert pat.origin == int
-    assert pat.execute(123).value() == 123
+    assert pat.match(123) == 123
     assert pat.execute("abc").failed
-    print(pat)
-    print(pat.execute(123).error())
-    print(pat.execute("abc").error())
+    assert str(pat) == "int"
+    assert pat.execute(123).error() is None
+    assert isinstance(pat.execute("abc").error(), MatchFailed)
+    with pytest.raises(MatchFailed):
+        pat.match("abc")
 
 
 def test_pattern_on():
     """测试 Pattern 的快速创建方法之一, 对对象有效"""
-    pat1 = Pattern.on(123)
+    pat1 = _P_ON_123
     assert pat1.origin == int
-    assert pat1.execute(123).value() == 123
+    assert pat1.match(123) == 123
     assert pat1.execute(124).failed
-    print(pat1)
+    assert str(pat1) == "int"
 
 
 def test_pattern_keep():
     """测试 Pattern 的保持模式, 不会进行匹配或者类型转换"""
     pat2 = Pattern()
-    assert pat2.execute(123).value() == 123
-    assert pat2.execute("abc").value() == "abc"
-    print(pat2)
+    assert pat2.match(123) == 123
+    assert pat2.match("abc") == "abc"
+    assert str(pat2).endswith("Any")  # 3.9 的 Any 没有 __name__, 显示为 typing.Any
 
 
 def test_pattern_regex():
     """测试 Pattern 的正则匹配模式, 仅正则匹配"""
-    import re
-
-    pat3 = Pattern.regex_match("abc[A-Z]+123")
-    assert pat3.execute("abcABC123").value() == "abcABC123"
+    pat3 = _P_REGEX
+    assert pat3.match("abcABC123") == "abcABC123"
     assert pat3.execute("abcAbc123").failed
-    print(pat3)
+    assert "abc[A-Z]+123" in str(pat3.execute("abcAbc123").error())
+    with pytest.raises(MatchFailed, match=re.escape("abc[A-Z]+123")):
+        pat3.match("abcAbc123")
+    assert str(pat3) == "abc[A-Z]+123"
+    assert Pattern.regex_match("abc[A-Z]+123").regex is pat3.regex
 
     with pytest.raises(ValueError):
         Pattern.regex_match("^abc[A-Z]+123")
 
-    pat3_1 = Pattern.regex_match(re.compile(r"abc[A-Z]+123"))
-    assert pat3_1.execute("abcABC123").value() == "abcABC123"
+    pat3_1 = _P_REGEX_COMPILED
+    assert pat3_1.match("abcABC123") == "abcABC123"
+    assert Pattern.regex_match(re.compile("abc", re.M)).match("123\nabc") == "abc"
 
-    pat3_2 = Pattern.regex_match("abc").prefixed()
-    assert pat3_2.execute("abc123").value() == "abc"
+    pat3_2 = _P_REGEX_PREFIXED
+    assert pat3_2.match("abc123") == "abc"
     assert pat3_2.execute("123abc").failed
 
-    pat3_3 = Pattern.regex_match("abc").suffixed()
-    assert pat3_3.execute("123abc").value() == "abc"
+    pat3_3 = _P_REGEX_SUFFIXED
+    assert pat3_3.match("123abc") == "abc"
     assert pat3_3.execute("abc123").failed
 
 
+def test_pattern_regex_dfa():
+    """RE2 需要通过 dfa=True 显式启用, 默认始终使用 re"""
+    pytest.importorskip("re2")
+    assert isinstance(Pattern.regex_match("abc").regex, re.Pattern)
+    assert Pattern.regex_match("abc").match("abc\n") == "abc"
+    assert EMAIL.match("用户@例子.com") == "用户@例子.com"
+
+    pat3_4 = Pattern.regex_match("abc", dfa=True)
+    assert not isinstance(pat3_4.regex, re.Pattern)
+    assert pat3_4.match("abc") == "abc"
+    # RE2 的 $ 不匹配末尾换行符之前的位置, \w 只匹配 ASCII 字符
+    assert pat3_4.execute("abc\n").failed
+    assert Pattern.regex_match(r"\w+", dfa=True).execute("用户").failed
+    # RE2 不支持的语法 (如反向引用) 回退到 re
+    pat3_5 = Pattern.regex_match(r"(a)\1", dfa=True)
+    assert isinstance(pat3_5.regex, re.Pattern)
+    assert pat3_5.match("aa") == "aa"
+
+
 def test_pattern_regex_convert():
     """测试 Pattern 的正则转换模式, 正则匹配成功后再进行类型转换"""
-    pat4 = Pattern.regex_convert(
-        r"\[at:(\d+)\]", int, lambda m: res if (res := int(m[1])) < 1000000 else None, allow_origin=True
-    )
-    assert pat4.execute("[at:123456]").value() == 123456
+    pat4 = _P_AT
+    assert pat4.match("[at:123456]") == 123456
     assert pat4.execute("[at:abcdef]").failed
-    assert pat4.execute(123456).value() == 123456
+    assert pat4.match(123456) == 123456
     assert pat4.execute("[at:1234567]").failed
-    print(pat4)
 
-    pat4_1 = Pattern.regex_convert(r"\[at:(\d+)\]", int, lambda m: int(m[1]), allow_origin=False)
-    assert pat4_1.execute("[at:123456]").value() == 123456
+    pat4_1 = _P_AT_STRICT
+    assert pat4_1.match("[at:123456]") == 123456
     assert pat4_1.execute("[at:abcdef]").failed
     assert pat4_1.execute(123456).failed
-    print(pat4_1)
 
 
 def test_pattern_type_convert():
     """测试 Pattern 的类型转换模式, 仅将传入对象变为另一类型的新对象"""
-    pat5 = Pattern(origin=str).accept(...).convert(lambda _, x: str(x))
-    assert pat5.execute(123).value() == "123"
-    assert pat5.execute([4, 5, 6]).value() == "[4, 5, 6]"
-    pat5_1 = Pattern(origin=int).accept(...).convert(lambda _, x: int(x))
-    assert pat5_1.execute("123").value() == 123
+    pat5 = Pattern(origin=str).accept(...).convert(_to_str)
+    assert pat5.match(123) == "123"
+    assert pat5.match([4, 5, 6]) == "[4, 5, 6]"
+    pat5_1 = Pattern(origin=int).accept(...).convert(_to_int)
+    assert pat5_1.match("123") == 123
     assert pat5_1.execute("123.0").failed
-    print(pat5)
+    assert str(pat5) == "str"
 
-    def convert(_, content):
-        if isinstance(content, str) and content.startswith("123"):
-            return 123
-
-    pat5_3 = Pattern(origin=int).accept(str).convert(convert)
-    assert pat5_3.execute("1234abcd").value() == 123
+    pat5_3 = Pattern(origin=int).accept(str).convert(_startswith_123)
+    assert pat5_3.match("1234abcd") == 123
     assert pat5_3.execute("abc").failed
-    prev = Pattern(origin=str).convert(lambda _, x: f"123{x}")
-    pat5_4 = Pattern(int).accept(str).convert(lambda _, x: convert(_, prev.match(x)))
-    assert pat5_4.execute("abc").value() == 123
+    prev = Pattern(origin=str).convert(_prefix_123)
+    pat5_4 = Pattern(int).accept(str).convert(partial(_after, prev, _startswith_123))
+    assert pat5_4.match("abc") == 123
+    pat5_5 = Pattern(str).accept(bytes)._unary_convert(bytes.decode)
+    assert pat5_5.match(b"123") == "123"
+    pat5_6 = Pattern(int).accept(str)._unary_convert(int)
+    assert pat5_6.match("123") == 123
+    assert pat5_6.execute("abc").failed
 
 
 def test_pattern_accepts():
     """测试 Pattern 的输入类型筛选, 不在范围内的类型视为非法"""
 
-    pat6 = Pattern(str).accept(bytes).convert(lambda _, x: x.decode())
+    pat6 = Pattern(str).accept(bytes).convert(_decode)
     assert pat6.execute(b"123").value() == "123"
     assert pat6.execute(123).failed
     pat6_1 = Pattern().accept(Union[int, float])
     assert pat6_1.execute(123).value() == 123
     assert pat6_1.execute("123").failed
-    print(pat6, pat6_1)
+    assert isinstance(pat6_1.execute("123").error(), MatchFailed)
+    assert str(pat6) == "bytes -> str"
 
 
 def test_pattern_pre_validator():
     """测试 Pattern 的匹配前验证器, 会在匹配前对输入进行验证"""
-    pat7 = Pattern(float).pre_validate(lambda x: x != 0).convert(lambda _, x: 1 / x)
+    pat7 = Pattern(float).pre_validate(_nonzero).convert(_recip)
     assert pat7.execute(123).value() == 1 / 123
     assert pat7.execute(0).failed
-    print(pat7)
 
 
 def test_pattern_anti():
     """测试 Pattern 的反向验证功能"""
-    pat8 = Pattern(int)
-    pat8_1 = AntiPattern(pat8)
+    pat8 = _PAT_INT
+    pat8_1 = _ANTI_P_INT
     assert pat8.execute(123).value() == 123
     assert pat8.execute("123").failed
     assert pat8_1.execute(123).failed
     assert pat8_1.execute("123").value() == "123"
+    assert isinstance(pat8_1.execute(123).error(), MatchFailed)
+    assert isinstance(AntiPattern(Pattern(float).convert(_recip)).execute(0.0).error(), ZeroDivisionError)
+    assert pat8_1.match("123") == "123"
+    with pytest.raises(MatchFailed):
+        pat8_1.match(123)
 
 
 def test_pattern_validator():
     """测试 Pattern 的匹配后验证器, 会对匹配结果进行验证"""
-    pat9 = Pattern(int).pre_validate(lambda x: x > 0).accept(int)
+    pat9 = Pattern(int).pre_validate(_pos).accept(int)
     assert pat9.execute(23).value() == 23
     assert pat9.execute(-23).failed
-    print(pat9)
 
 
 def test_pattern_post_validator():
     """测试 Pattern 的匹配后验证器, 会对转换后的结果进行验证"""
-    pat10 = Pattern(int).convert(lambda _, x: x + 1).post_validate(lambda x: x % 2 == 0)
+    pat10 = Pattern(int).convert(_inc).post_validate(_even)
     assert pat10.execute(123).value() == 124
     assert pat10.execute(122).failed
-    print(pat10)
+    pat10_1 = Pattern(int).convert(_inc)
+    assert pat10_1.execute(122).value() == 123
+    pat10_1.post_validate(_even)
+    assert pat10_1.execute(122).failed
+    assert pat10_1.copy().execute(123).value() == 124
 
 
 def test_parser():
-    from typing import Literal, Protocol, Type, TypeVar, Sequence
-    from typing_extensions import Annotated
-
     pat11 = parser(int)
     assert pat11.execute(-321).success
     pat11_1 = parser(123)
-    print(pat11, pat11_1)
+    assert pat11_1 == _P_ON_123
     pat11_2 = parser(int)
     assert pat11_2 == pat11
     assert isinstance(parser(Literal["a", "b"]), UnionPattern)
@@ -251,6 +591,8 @@ def test_parser():
     assert parser(complex) != Pattern(complex)
     assert isinstance(parser("a|b|c"), UnionPattern)
     assert isinstance(parser("re:a|b|c"), Pattern)
+    assert parser("rep:a:b").execute("a:b").success
+    assert isinstance(parser("http://x"), DirectPattern)
     assert parser([1, 2, 3]).execute(1).success
     assert parser({"a": 1, "b": 2}).execute("a").value() == 1
 
@@ -267,14 +609,19 @@ def test_parser():
     assert pat11_3._accepts == int
 
     assert parser(complex, extra="ignore") == ANY
+    assert isinstance(parser(complex), DirectTypePattern)
 
     with pytest.raises(TypeError):
         parser(complex, extra="reject")
 
-    pat11_4 = parser(Annotated[int, lambda x: x < 10])
+    pat11_4 = parser(Annotated[int, _lt10])
     assert pat11_4.execute(11).failed
-    pat11_5 = parser(Annotated[int, lambda x: x >= 0, "normal number"])
+    pat11_5 = parser(Annotated[int, _non_negative, "normal number"])
     assert pat11_5.alias == "normal number"
+    pat11_5_1 = parser(Annotated[int, _pos, _lt10])
+    assert pat11_5_1.execute(5).success
+    assert pat11_5_1.execute(0).failed
+    assert pat11_5_1.execute(10).failed
 
     class TestP(Protocol):
         def __setitem__(self): ...
@@ -288,29 +635,54 @@ def test_parser():
     assert pat11_7.execute("abc").success
     assert pat11_7.execute([]).failed
 
-    pat11_8 = parser(Sequence[int])
+    pat11_8 = _P_SEQ_INT
     assert pat11_8.execute([1, 2, 3]).success
     assert pat11_8.execute((1, 2, 3)).success
 
+    pat11_9 = parser(List[int])
+    assert pat11_9.execute([1, 2, 3]).success
+    assert pat11_9.execute([1, "2", 3]).failed
+    assert pat11_9.execute((1, 2, 3)).failed
+    pat11_10 = parser(Tuple[int, ...])
+    assert pat11_10.execute((1, 2, 3)).success
+    assert pat11_10.execute((1, 2.0)).failed
+    pat11_10_1 = parser(Tuple[int])
+    assert pat11_10_1.execute((1,)).success
+    assert pat11_10_1.execute((1, 2)).failed
+    pat11_11 = parser(Dict[str, int])
+    assert pat11_11.execute({"a": 1}).success
+    assert pat11_11.execute({"a": "1"}).failed
+    assert pat11_11.execute({1: 1}).failed
+    assert parser(List[int]) == pat11_9
+
+
+@_GLOBAL_REGISTRY
+def test_parser_fresh(local_scope):
+    """parser 每次构造新的表达式, 对结果原地修改不会影响之后的解析"""
+    pat = "ids" @ parser(List[int])
+    assert pat.alias == "ids"
+    assert parser(List[int]).alias != "ids"
+    parser("abc").alias = "X"
+    assert parser("abc").alias == "'abc'"
+    create_local_patterns("test_fresh", {int: _PAT_FLOAT})
+    assert _PAT_FLOAT in parser(Union[int, bool]).base
 
-def test_union_pattern():
-    from typing import List, Optional, Union, Annotated
 
-    pat12 = parser(Union[int, bool])
+def test_union_pattern():
+    pat12 = _P_UNION_INT_BOOL
     assert pat12.execute(123).success
     assert pat12.execute("123").success
     assert pat12.execute("123").value() == 123
     assert pat12.execute(123.0).value() == 123
-    pat12_1 = parser(Optional[str])
+    pat12_1 = _P_OPTIONAL_STR
     assert pat12_1.execute("123").success
     assert pat12_1.execute(None).success
-    pat12_2 = UnionPattern("abc", "efg")
+    pat12_2 = _P_UNION_STRS
     assert pat12_2.execute("abc").success
     assert pat12_2.execute("bca").failed
-    print(pat12, pat12_1, pat12_2)
-    pat12_3 = UnionPattern.of(List[bool], int)
-    print(pat12_3)
-    pat12_4 = UnionPattern.with_(INTEGER, WIDE_BOOLEAN)
+    assert str(pat12_2) == "'abc'|'efg'"
+    assert str(_P_LIST_BOOL_OR_INT) == "list[bool]|int"
+    pat12_4 = _P_UNION_INT_WIDE_BOOL
     assert pat12_4.execute(123).success
     assert pat12_4.execute("123").success
     assert pat12_4.execute("123").value() == 123
@@ -320,35 +692,59 @@ def test_union_pattern():
     assert pat12_4.execute("false").value() is False
     assert pat12_4.execute("yes").success
     assert pat12_4.execute("yes").value() is True
-
-
-def test_converters():
-    pattern_map = all_patterns()
-    print(pattern_map)
-    assert pattern_map["any_str"].execute(123456).value() == "123456"
-    assert pattern_map["email"].execute("example@outlook.com").success
-    assert pattern_map["ip"].execute("192.168.0.1").success
-    assert pattern_map["url"].execute("www.example.com").success
-    assert pattern_map["url"].execute("https://www.example.com").value() == "https://www.example.com"
-    assert pattern_map["url"].execute("wwwexamplecom").failed
-    assert pattern_map["hex"].execute("0xff").value() == 255
-    assert pattern_map["color"].execute("#ffffff").value() == "ffffff"
-    assert pattern_map["datetime"].execute("2011-11-04").value().day == 4
-    assert pattern_map["file"].execute("test.py").value()[:4] == b"from"
-    assert pattern_map["number"].execute("123").value() == 123
-    assert pattern_map["int"].execute("123").value() == 123
-    assert pattern_map["float"].execute("12.34").value() == 12.34
-    assert pattern_map["bool"].execute("false").value() is False
-    assert pattern_map[list].execute("[1,2,3]").value() == [1, 2, 3]
-    assert pattern_map[tuple].execute("(1,2,3)").value() == (1, 2, 3)
-    assert pattern_map[set].execute("{1,2,3}").value() == {1, 2, 3}
-    assert pattern_map[dict].execute('{"a":1,"b":2,"c":3}').value() == {
-        "a": 1,
-        "b": 2,
-        "c": 3,
-    }
-
-
+    pat12_5 = _P_UNION_STR_BYTES
+    assert pat12_5.execute(b"abc").value() == b"abc"
+    assert pat12_5.execute(123).failed
+    pat12_6 = _P_UNION_INT_STR
+    assert pat12_6.execute("123").value() == 123
+    assert pat12_6.execute("abc").value() == "abc"
+    pat12_7 = _P_UNION_CONVERTERS
+    assert pat12_7.execute(1).value() == 2
+    assert pat12_7.execute(b"abc").value() == "abc"
+    assert pat12_7.execute(1.0).failed
+
+    # 分支在联合表达式匹配过后被修改, 缓存的候选分支需要随之更新
+    branch = Pattern(int).accept(int)
+    pat12_8 = UnionPattern(branch, Pattern(str).accept(str))
+    assert pat12_8.execute(1.5).failed
+    branch.accept(float)
+    assert pat12_8.execute(1.5).value() == 1.5
+
+
+_CONVERTER_CASES = [
+    ("any_str", 123456, "123456"),
+    ("email", "example@outlook.com", _SUCCESS),
+    ("ip", "192.168.0.1", _SUCCESS),
+    ("url", "www.example.com", _SUCCESS),
+    ("url", "https://www.example.com", "https://www.example.com"),
+    ("url", "wwwexamplecom", _FAILED),
+    ("hex", "0xff", 255),
+    ("color", "#ffffff", "ffffff"),
+    ("datetime", "2011-11-04", datetime(2011, 11, 4)),
+    ("file", "test.py", Path(__file__).read_bytes()),
+    ("number", "123", 123),
+    ("int", "123", 123),
+    ("float", "12.34", 12.34),
+    ("bool", "false", False),
+    (list, "[1,2,3]", [1, 2, 3]),
+    (tuple, "(1,2,3)", (1, 2, 3)),
+    (set, "{1,2,3}", {1, 2, 3}),
+    (dict, '{"a":1,"b":2,"c":3}', {"a": 1, "b": 2, "c": 3}),
+]
+
+
+@_GLOBAL_REGISTRY
+@pytest.mark.parametrize("key, input_, expected", _CONVERTER_CASES)
+def test_converters(pattern_map, key, input_, expected):
+    res = pattern_map[key].execute(input_)
+    if expected is _FAILED:
+        assert res.failed
+    else:
+        assert res.success
+        assert expected is _SUCCESS or res.value() == expected
+
+
+@_GLOBAL_REGISTRY
 def test_converter_method():
     temp = create_local_patterns("test", set_current=False)
     temp.set(Pattern(complex, "complex"))
@@ -373,51 +769,56 @@ def test_converter_method():
 
 
 def test_regex_pattern():
-    from re import Match, compile
-
-    pat18 = RegexPattern(r"((https?://)?github\.com/)?(?P<owner>[^/]+)/(?P<repo>[^/]+)", "ghrepo")
-    res = pat18.execute("https://github.com/ArcletProject/NEPattern").value()
-    assert isinstance(res, Match)
-    assert res.groupdict() == {"owner": "ArcletProject", "repo": "NEPattern"}
+    assert isinstance(_MATCH18, Match)
+    assert _MATCH18.groupdict() == {"owner": "ArcletProject", "repo": "NEPattern"}
     assert pat18.execute(123).failed
     assert pat18.execute("www.bilibili.com").failed
-    pat18_1 = parser(r"re:(\d+)")  # str starts with "re:" will convert to Pattern instead of RegexPattern
+    assert isinstance(pat18.execute("www.bilibili.com").error(), MatchFailed)
+    assert pat18_2.suffixed().execute("abc1234").value()[0] == "1234"
     assert pat18_1.execute("1234").value() == "1234"
-    pat18_2 = parser(r"rep:(\d+)")  # str starts with "rep:" will convert to RegexPattern
     assert pat18_2.execute("1234").value().groups() == ("1234",)  # type: ignore
-    pat18_3 = parser(compile(r"(\d+)"))  # re.Pattern will convert to RegexPattern
     assert pat18_3.execute("1234").value().groups() == ("1234",)
 
 
 def test_switch_pattern():
-    from typing import Annotated
-
-    pat19 = SwitchPattern({"foo": 1, "bar": 2})
-    assert pat19.execute("foo").value() == 1
-    assert pat19.execute("baz").failed
-    pat19_1 = SwitchPattern({"foo": 1, "bar": 2, ...: 3})
-    assert pat19_1.execute("foo").value() == 1
-    assert pat19_1.execute("baz").value() == 3
-    pat19_2 = parser(Annotated[int, {"foo": 1, "bar": 2}])
-    assert pat19_2.execute("foo").value() == 1
-    assert pat19_2.execute("baz").failed
-
-
-def test_patterns():
+    assert ok(_SW, "foo") == 1
+    assert ok(_SW, "bar") == 2
+    fail(_SW, "baz")
+    fail(_SW, [])
+    assert isinstance(_SW.execute("baz").error(), MatchFailed)
+    assert ok(_SW_DEF, "foo") == 1
+    assert ok(_SW_DEF, "baz") == 3
+    assert ok(_SW_ANNOTATED, "foo") == 1
+    fail(_SW_ANNOTATED, "baz")
+
+
+@_GLOBAL_REGISTRY
+def test_patterns(local_scope):
+    # 只在切换/修改表达式组之后重新获取, 其余断言复用同一份映射
     temp = create_local_patterns("temp", {"a": Pattern.on("A")})
     assert temp["a"]
-    assert local_patterns() == temp
-    assert all_patterns()["a"]
+    current = local_patterns()
+    assert current == temp
     temp1 = create_local_patterns("temp1", {"b": Pattern.on("B")}, set_current=False)
     assert temp1["b"]
-    assert not local_patterns().get("b")
+    assert not current.get("b")
+    merged = all_patterns()
+    assert merged["a"]
+    assert "b" not in merged
     switch_local_patterns("temp1")
-    assert local_patterns()["b"]
-    assert not local_patterns().get("a")
+    current = local_patterns()
+    assert current["b"]
+    assert not current.get("a")
     switch_local_patterns("temp")
-    assert local_patterns()["a"]
-    assert not local_patterns().get("b")
-    reset_local_patterns()
+    current = local_patterns()
+    assert current["a"]
+    assert not current.get("b")
+    merged = all_patterns()
+    assert merged is all_patterns()
+    assert "b" not in merged
+    temp.set(Pattern.on("B"), alias="b")
+    assert all_patterns() is not merged
+    assert all_patterns()["b"]
 
     with pytest.raises(ValueError):
         create_local_patterns("$temp")
@@ -429,32 +830,36 @@ def test_patterns():
         switch_local_patterns("temp2")
 
 
-def test_rawstr():
-    assert parser("url") == URL
+@_GLOBAL_REGISTRY
+def test_rawstr(pattern_map):
+    assert parser("url") == pattern_map["url"] == URL
     assert parser(RawStr("url")) == DirectPattern("url", "'url'")
 
 
 def test_direct():
-    pat20 = DirectPattern("abc")
-    assert pat20.execute("abc").value() == "abc"
-    assert pat20.execute("abcd").failed
-    assert pat20.execute(123).failed
-    pat20_1 = DirectPattern(123)
-    assert pat20_1.execute(123).value() == 123
-    assert pat20_1.execute("123").failed
+    pat20 = _P_DIRECT_ABC
+    assert ok(pat20, "abc") == "abc"
+    fail(pat20, "abcd")
+    with pytest.raises(MatchFailed):
+        pat20.match("abcd")
+    fail(pat20, 123)
+    pat20_1 = _P_ON_123
+    assert ok(pat20_1, 123) == 123
+    fail(pat20_1, "123")
+    assert isinstance(pat20_1.execute("123").error(), MatchFailed)
     assert pat20_1.match(123) == 123
     with pytest.raises(MatchFailed):
         pat20_1.match("123")
-    pat21 = DirectTypePattern(int)
-    assert pat21.execute(123).value() == 123
-    assert pat21.execute("123").failed
+    pat21 = _P_DIRECT_TYPE_INT
+    assert ok(pat21, 123) == 123
+    fail(pat21, "123")
     assert pat21.match(123) == 123
     assert pat21.match(456) == 456
+    with pytest.raises(MatchFailed):
+        pat21.match("123")
 
 
 def test_forward_ref():
-    from typing import ForwardRef
-
     pat21 = parser(ForwardRef("int"))
     assert pat21.execute(123).value() == 123
     assert pat21.execute("int").value() == "int"
@@ -462,87 +867,124 @@ def test_forward_ref():
 
 
 def test_value_operate():
-    pat22 = Pattern(origin=int).convert(
-        lambda _, x: x + 1,
-    )
+    pat22 = Pattern(origin=int).convert(_inc)
     assert pat22.execute(123).value() == 124
     assert pat22.execute("123").failed
     assert pat22.execute(123.0).failed
 
 
 def test_eq():
-    assert parser(123) == Pattern.on(123)
+    assert parser(123) == _P_ON_123
     assert parser(None) == NONE
-    assert parser(Pattern(int)) == Pattern(int)
+    assert parser(_PAT_INT) is _PAT_INT
+    assert parser(Pattern(int)) == _PAT_INT
     assert parser(str) == STRING
+    assert Pattern(int, "a") != Pattern(int, "b")
+    assert Pattern(int).convert(int) != Pattern(int)
+    assert hash(Pattern(int)) == hash(_PAT_INT)
+
+
+@pytest.mark.parametrize(
+    "expr, expected",
+    [
+        (lambda: ("test_float" @ _PAT_FLOAT.copy()).alias, "test_float"),
+        (lambda: (_PAT_FLOAT.copy() @ "float_alias").alias, "float_alias"),
+        (lambda: (_PAT_FLOAT << 1.33).value(), 1.33),
+        (lambda: (_PAT_FLOAT << "1.33").failed, True),
+        (lambda: _PAT_INT == Pattern(int), True),
+        (lambda: hash(_PAT_INT) == hash(Pattern(int)), True),
+        (lambda: _PAT_INT == _PAT_FLOAT, False),
+    ],
+    ids=["rmatmul", "matmul", "lshift", "lshift_failed", "eq", "hash", "ne"],
+)
+def test_dunder(expr, expected):
+    assert expr() == expected
 
 
 def test_combine():
-    pre = Pattern(origin=str).convert(lambda _, x: x.replace(",", "_"))
+    pre = Pattern(origin=str).convert(_repl_comma)
     pat23 = combine(INTEGER, pre)
     assert pat23.execute("123,456").value() == 123456
     assert pat23.execute("1,000,000").value() == 1_000_000
-
-    pat23_1 = combine(INTEGER, alias="0~10", validator=lambda x: 0 <= x <= 10)
+    assert pat23.execute("1,,000").failed
+    pat23_3 = combine(INTEGER, Pattern(str).accept(str).convert(_strip_or_none))
+    assert pat23_3.execute(" 12 ").value() == 12
+    assert pat23_3.execute("  ").failed
+    assert isinstance(pat23_3.execute(12).error(), MatchFailed)
+
+    # combine 之后再修改前置表达式, 组合后的表达式应当按修改后的状态匹配
+    prev23 = Pattern(str).accept(int).convert(_to_str)
+    pat23_4 = combine(Pattern(str).accept(str), prev23)
+    assert pat23_4.execute(1).value() == "1"
+    prev23.accept(float)
+    assert pat23_4.execute(1.5).value() == "1.5"
+    prev23.post_validate(_len_lt3)
+    assert pat23_4.execute(0.5).failed
+    # 修改后的前置表达式仍是必经的一步: 它不再接受的输入类型照样匹配失败
+    gate23 = Pattern(str).accept(str).convert(_to_str)
+    pat23_5 = combine(Pattern(str).accept(str), gate23)
+    assert pat23_5.execute("a").value() == "a"
+    gate23.accept(bytes)
+    assert pat23_5.execute("a").failed
+    assert isinstance(pat23_5.execute("a").error(), MatchFailed)
+    assert pat23_5.execute(b"a").value() == "b'a'"
+
+    pat23_1 = combine(INTEGER, alias="0~10", validator=_in_0_10)
     assert pat23_1.execute(5).value() == 5
     assert pat23_1.execute(11).failed
     assert str(pat23_1) == "0~10"
-
-
-def test_funcs():
-    from dataclasses import dataclass
-    from nepattern.func import Index, Slice, Map, Filter, Reduce, Join, Upper, Lower, Sum, Step, Dot, GetItem
-
-    pat = Pattern(list[str], "chars").accept(str).convert(lambda _, x: list(x))
-    assert pat.execute("abcde").value() == ["a", "b", "c", "d", "e"]
-
-    pat24 = Index(pat, 2)
-    assert pat24.execute("abcde").value() == "c"
-
-    pat24_1 = Slice(pat, 1, 3)
-    assert pat24_1.execute("abcde").value() == ["b", "c"]
-
-    pat24_2 = Map(pat, lambda x: x.upper(), "str.upper")
-    assert pat24_2.execute("abcde").value() == ["A", "B", "C", "D", "E"]
-
-    pat24_3 = Filter(pat, lambda x: x in "aeiou", "vowels")
-    assert pat24_3.execute("abcde").value() == ["a", "e"]
-
-    pat24_4 = Filter(Map(pat, lambda x: x.upper(), "str.upper"), lambda x: x in "AEIOU", "vowels")
-    assert pat24_4.execute("abcde").value() == ["A", "E"]
-
-    pat24_5 = Reduce(pat24_2, lambda x, y: x + y, funcname="add")
-    assert pat24_5.execute("abcde").value() == "ABCDE"
-
-    pat24_6 = Join(pat, sep="-")
-    assert pat24_6.execute("abcde").value() == "a-b-c-d-e"
-
-    pat24_7 = Upper(pat24_6)
-    assert pat24_7.execute("abcde").value() == "A-B-C-D-E"
-
-    pat24_8 = Lower(pat24_7)
-    assert pat24_8.execute("abcde").value() == "a-b-c-d-e"
-
-    pat24_9 = Sum(Map(pat, ord))
-    assert pat24_9.execute("abcde").value() == 495
-
-    pat24_10 = Step(pat, len)
-    assert pat24_10.execute("abcde").value() == 5
-
-    pat24_11 = Step(pat, lambda x: x.count("a"), funcname="count_a")
-    assert pat24_11.execute("abcde").value() == 1
-
-    @dataclass
-    class Test:
-        a: int
-        b: str
-
-    pat1 = Pattern(Test)
-    obj = Test(123, "abc")
-    assert pat1.execute(obj).value() == obj
+    pat23_2 = combine(INTEGER, pre, validator=_gt1000)
+    assert pat23_2.execute("1,000,000").value() == 1_000_000
+    assert pat23_2.execute("1,000").failed
+
+
+_PAT_CHARS = Pattern(list[str], "chars").accept(str).convert(_to_list)
+_PAT_INDEX = Index(_PAT_CHARS, 2)
+_PAT_SLICE = Slice(_PAT_CHARS, 1, 3)
+_PAT_MAP = Map(_PAT_CHARS, _upper, "str.upper")
+_PAT_FILTER = Filter(_PAT_CHARS, _vowel, "vowels")
+_PAT_MAP_FILTER = Filter(_PAT_MAP, _upper_vowel, "vowels")
+_PAT_REDUCE = Reduce(_PAT_MAP, _add, funcname="add")
+_PAT_JOIN = Join(_PAT_CHARS, sep="-")
+_PAT_MAP_JOIN = Join(_PAT_MAP_FILTER, sep="")
+_PAT_UPPER = Upper(_PAT_JOIN)
+_PAT_LOWER = Lower(_PAT_UPPER)
+_PAT_SUM = Sum(Map(_PAT_CHARS, ord))
+_PAT_SUM_FILTERED = Sum(Filter(Map(_PAT_CHARS, ord), _gt99))
+_PAT_LEN = Step(_PAT_CHARS, len)
+_PAT_COUNT = Step(_PAT_CHARS, _count_a, funcname="count_a")
+
+
+@pytest.fixture(scope="module")
+def chars():
+    return _PAT_CHARS.execute("abcde").value()
+
+
+def test_funcs(chars):
+    assert chars == ["a", "b", "c", "d", "e"]
+    assert _PAT_INDEX.execute("abcde").value() == chars[2]
+    assert _PAT_SLICE.execute("abcde").value() == chars[1:3]
+    assert _PAT_MAP.execute("abcde").value() == [c.upper() for c in chars]
+    assert _PAT_FILTER.execute("abcde").value() == ["a", "e"]
+    assert _PAT_MAP_FILTER.execute("abcde").value() == ["A", "E"]
+    assert _PAT_REDUCE.execute("abcde").value() == "ABCDE"
+    assert _PAT_JOIN.execute("abcde").value() == "-".join(chars)
+    assert _PAT_MAP_JOIN.execute("abcde").value() == "AE"
+    assert _PAT_UPPER.execute("abcde").value() == "A-B-C-D-E"
+    assert _PAT_LOWER.execute("abcde").value() == "a-b-c-d-e"
+    assert _PAT_SUM.execute("abcde").value() == sum(map(ord, chars)) == 495
+    assert _PAT_SUM_FILTERED.execute("abcde").value() == 100 + 101
+    assert _PAT_LEN.execute("abcde").value() == len(chars)
+    assert _PAT_COUNT.execute("abcde").value() == 1
+
+    pat1 = Pattern(Item)
+    assert pat1.execute(_ITEM).value() == _ITEM
 
     pat24_12 = Dot(pat1, int, "a")
-    assert pat24_12.execute(obj).value() == 123
+    assert pat24_12.execute(_ITEM).value() == 123
+    assert Dot(pat1, int, "c", 0).execute(_ITEM).value() == 0
+    # 含 "." 的键是单个属性名, 而不是链式取值
+    assert Dot(pat1, str, "b.upper", "none").execute(_ITEM).value() == "none"
 
     pat2 = Pattern.on({"a": 123, "b": "abc"})
     pat24_13 = GetItem(pat2, int, "a")
@@ -550,6 +992,4 @@ def test_funcs():
 
 
 if __name__ == "__main__":
-    import pytest
-
-    pytest.main([__file__, "-vs"])
+    pytest.main([__file__, "-q", "-p", "no:cacheprovider", "--no-header", "-o", "console_output_style=count"])